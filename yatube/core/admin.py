@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+CURSOR_VAR = 'cursor'
+
+
+class EstimatedCountPaginator(Paginator):
+    """Считает строки не дальше ADMIN_COUNT_LIMIT.
+
+    Без фильтров большая таблица оценивается по наибольшему pk, с
+    фильтрами число упирается в предел.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        queryset = self.object_list.order_by()
+        count = queryset[:limit].count()
+        if count < limit or queryset.query.where:
+            return count
+        return max(queryset.aggregate(last=Max('pk'))['last'] or 0, count)
+
+
+class KeysetChangeList(ChangeList):
+    """Список админки, который листается по pk, а не через OFFSET.
+
+    Пока список не отсортирован по столбцу, страница за курсором
+    выбирается как pk < курсора.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        cursor = request.GET.get(CURSOR_VAR, '')
+        self.cursor = int(cursor) if cursor.isdigit() else None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_VAR, None)
+        return params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Курсор не переживает смену фильтров, поиска и сортировки.
+        return super().get_query_string(
+            new_params, [CURSOR_VAR, *(remove or [])])
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        if not self.keyset:
+            return
+        queryset = self.queryset
+        if self.cursor is not None:
+            queryset = queryset.filter(pk__lt=self.cursor)
+        self.result_list = queryset[:self.list_per_page]
+        self.multi_page = True
+
+    @cached_property
+    def next_cursor(self):
+        pks = [obj.pk for obj in self.result_list]
+        if len(pks) < self.list_per_page:
+            return None
+        return pks[-1]
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string()
+
+
+class BackgroundDeleteMixin:
+    """Удаление из админки без сборщика связанных объектов в запросе.
+
+    Страница подтверждения не перебирает каскад, а delete_model и
+    delete_queryset передают pk в soft_delete(request, pks). Его
+    определяет каждая админка: он скрывает объекты и ставит их удаление
+    в очередь задач.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        deleted_objects = [str(obj) for obj in objs]
+        model_count = {self.opts.verbose_name_plural: len(deleted_objects)}
+        return deleted_objects, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        self.soft_delete(request, [obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        self.soft_delete(request, list(queryset.values_list('pk', flat=True)))
+
+
+class LargeTableAdminMixin:
+    """Список для таблиц в миллионы строк.
+
+    Страницы выбираются по курсору от новых к старым, вместо COUNT(*)
+    берётся оценка. Связанные объекты списка подгружайте через
+    list_select_related, а в формах выбирайте через autocomplete_fields.
+    """
+
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,187 @@
+import hashlib
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+GENERATION_KEY = 'generation:{}'
+STATS_KEY = 'fragment_stats:{}:{}'
+LOCK_KEY = 'lock:{}'
+
+
+def _new_generation():
+    # Поколение, потерянное при очистке кэша, не должно совпасть со старым,
+    # иначе снова станут видны фрагменты, собранные до изменений.
+    return time.time_ns() // 1000
+
+
+def get_generations(names):
+    keys = [GENERATION_KEY.format(name) for name in names]
+    values = cache.get_many(keys)
+    result = []
+    for key in keys:
+        if key not in values:
+            cache.add(key, _new_generation(), None)
+            values[key] = cache.get(key)
+        result.append(values[key])
+    return result
+
+
+def get_generation(name):
+    return get_generations([name])[0]
+
+
+def bump_generation(*names):
+    """Делает устаревшими все ключи, собранные из этих поколений."""
+    for name in names:
+        key = GENERATION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), None)
+
+
+def make_etag(request, generations, *parts):
+    """ETag страницы без запросов к базе.
+
+    Меняется вместе с поколениями её данных, с пользователем и с его
+    CSRF-токеном, чтобы 304 не вернул форму со старым токеном.
+    """
+    vary_on = [*get_generations(generations), request.user.pk,
+               request.COOKIES.get(settings.CSRF_COOKIE_NAME), *parts]
+    return _vary_hash(vary_on)
+
+
+def _page_number(request):
+    if 'cursor' in request.GET:
+        return request.GET['cursor']
+    page = request.GET.get('page', '')
+    return int(page) if page.isdigit() and int(page) > 0 else 1
+
+
+# Измерения, по которым может различаться кэшированный фрагмент.
+VARY_DIMENSIONS = {
+    'auth': lambda request: request.user.is_authenticated,
+    'user': lambda request: request.user.pk,
+    'page': lambda request: _page_number(request),
+    'path': lambda request: request.get_full_path(),
+}
+
+
+def get_vary_values(request, dimensions):
+    unknown = set(dimensions) - set(VARY_DIMENSIONS)
+    if unknown:
+        raise ValueError(
+            'Неизвестные измерения: ' + ', '.join(sorted(unknown)))
+    return [
+        f'{name}={VARY_DIMENSIONS[name](request)}' for name in dimensions
+    ]
+
+
+def _vary_hash(vary_on):
+    return hashlib.md5(
+        ':'.join(str(value) for value in vary_on).encode()).hexdigest()
+
+
+def make_fragment_key(fragment_name, generations=(), vary_on=()):
+    versions = '.'.join(str(value) for value in get_generations(generations))
+    return f'fragment:{fragment_name}:{versions}:{_vary_hash(vary_on)}'
+
+
+def make_stale_key(fragment_name, vary_on=()):
+    """Ключ последнего значения фрагмента при любых поколениях."""
+    return f'stale:{fragment_name}:{_vary_hash(vary_on)}'
+
+
+def _should_refresh(refresh_at, delta):
+    # XFetch: чем ближе срок и дольше пересчёт, тем вероятнее
+    # обновить значение заранее, пока его ещё можно отдавать.
+    if refresh_at is None:
+        return False
+    jitter = -delta * settings.CACHE_XFETCH_BETA * math.log(
+        1 - random.random())
+    return time.time() + jitter >= refresh_at
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        envelope = cache.get(key)
+        if envelope is not None:
+            return envelope
+    return None
+
+
+def _compute(key, compute, timeout, stale_key):
+    started = time.monotonic()
+    value = compute()
+    refresh_at = None if timeout is None else time.time() + timeout
+    envelope = (value, refresh_at, time.monotonic() - started)
+    cache.set(key, envelope,
+              None if timeout is None else timeout + settings.CACHE_STALE_TTL)
+    if stale_key is not None:
+        cache.set(stale_key, envelope, None)
+    return value
+
+
+def fetch(key, compute, timeout=None, stale_key=None):
+    """Значение из кэша с защитой от одновременного пересчёта.
+
+    Возвращает пару (значение, взято ли оно из кэша). Пересчитывает
+    только тот, кто взял короткую блокировку. Остальные получают
+    прежнее значение: с истёкшим сроком или, по stale_key, собранное
+    при прошлых поколениях. Если прежнего нет, ждут CACHE_LOCK_WAIT.
+    """
+    envelope = cache.get(key)
+    if envelope is not None and not _should_refresh(*envelope[1:]):
+        return envelope[0], True
+    lock_key = LOCK_KEY.format(key)
+    locked = cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if envelope is None and stale_key is not None:
+            envelope = cache.get(stale_key)
+        if envelope is None:
+            envelope = _wait_for(key)
+        if envelope is not None:
+            return envelope[0], True
+    try:
+        return _compute(key, compute, timeout, stale_key), False
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+def record_lookup(fragment_name, hit):
+    if not settings.FRAGMENT_CACHE_STATS:
+        return
+    key = STATS_KEY.format(fragment_name, 'hits' if hit else 'misses')
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_stats(fragment_names):
+    """Возвращает {фрагмент: (попадания, промахи)}."""
+    keys = {
+        name: (STATS_KEY.format(name, 'hits'),
+               STATS_KEY.format(name, 'misses'))
+        for name in fragment_names
+    }
+    values = cache.get_many([key for pair in keys.values() for key in pair])
+    return {
+        name: (values.get(hits, 0), values.get(misses, 0))
+        for name, (hits, misses) in keys.items()
+    }
+
+
+def reset_stats(fragment_names):
+    cache.delete_many([
+        STATS_KEY.format(name, kind)
+        for name in fragment_names for kind in ('hits', 'misses')
+    ])
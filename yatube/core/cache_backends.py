@@ -0,0 +1,230 @@
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+
+class LockedFileBasedCache(FileBasedCache):
+    """Файловый кэш с атомарными между процессами add() и incr().
+
+    На них держатся блокировки пересчёта и поколения. Обе операции идут
+    под общей файловой блокировкой каталога, а incr() сохраняет срок
+    жизни ключа вместо TIMEOUT по умолчанию.
+    """
+
+    lock_name = 'atomic.lock'
+
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), 'ab') as f:
+            locks.lock(f, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(f)
+
+    def _read(self, fname):
+        try:
+            with open(fname, 'rb') as f:
+                expiry = pickle.load(f)
+                if expiry is None or expiry >= time.time():
+                    return expiry, pickle.loads(zlib.decompress(f.read()))
+        except (FileNotFoundError, EOFError):
+            pass
+        return None
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked():
+            entry = self._read(self._key_to_file(key, version))
+            if entry is None:
+                raise ValueError("Key '%s' not found" % key)
+            expiry, value = entry
+            value += delta
+            timeout = None if expiry is None else expiry - time.time()
+            self.set(key, value, timeout, version)
+        return value
+
+
+class TwoTierCache(BaseCache):
+    """Кэш процесса (L1, LRU) перед общим для всех процессов кэшем (L2).
+
+        CACHES = {
+            'default': {
+                'BACKEND': 'core.cache_backends.TwoTierCache',
+                'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 1000},
+            },
+            'shared': {...},
+        }
+
+    В L1 попадают только ключи с префиксами из L1_KEY_PREFIXES. В такие
+    ключи уже зашиты поколения или версии содержимого, поэтому после
+    изменения данных процессы просто перестают их запрашивать. Всё
+    остальное, включая сами поколения и счётчики, читается из L2, где
+    его видят все процессы. После clear() в L2 меняется эпоха, и каждый
+    процесс сбрасывает свой L1 не позже чем через L1_EPOCH_INTERVAL.
+    """
+
+    EPOCH_KEY = 'two_tier:epoch'
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS', {}))
+        self._l2_alias = options.pop('L2')
+        self._l1_max_entries = int(options.pop('L1_MAX_ENTRIES', 1000))
+        self._l1_timeout = options.pop('L1_TIMEOUT', 300)
+        self._l1_prefixes = tuple(
+            options.pop('L1_KEY_PREFIXES', ('fragment:', 'post_card:')))
+        self._epoch_interval = options.pop('L1_EPOCH_INTERVAL', 1)
+        super().__init__({**params, 'OPTIONS': options})
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_checked = 0
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _in_l1(self, key):
+        return key.startswith(self._l1_prefixes)
+
+    def _check_epoch(self):
+        now = time.monotonic()
+        if now - self._epoch_checked < self._epoch_interval:
+            return
+        self._epoch_checked = now
+        epoch = self.l2.get(self.EPOCH_KEY)
+        if epoch is None:
+            self.l2.add(self.EPOCH_KEY, time.time_ns(), None)
+            epoch = self.l2.get(self.EPOCH_KEY)
+        if epoch != self._epoch:
+            with self._lock:
+                self._l1.clear()
+            self._epoch = epoch
+
+    def _l1_get(self, key, version):
+        key = self.make_key(key, version)
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+        return pickle.loads(value)
+
+    def _l1_set(self, key, value, timeout, version):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is not None and timeout <= 0:
+            self._l1_delete(key, version)
+            return
+        if self._l1_timeout is not None:
+            timeout = (self._l1_timeout if timeout is None
+                       else min(timeout, self._l1_timeout))
+        expires = None if timeout is None else time.monotonic() + timeout
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        key = self.make_key(key, version)
+        with self._lock:
+            self._l1[key] = (expires, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key, version):
+        with self._lock:
+            self._l1.pop(self.make_key(key, version), None)
+
+    def get(self, key, default=None, version=None):
+        if not self._in_l1(key):
+            return self.l2.get(key, default, version)
+        self._check_epoch()
+        value = self._l1_get(key, version)
+        if value is None:
+            value = self.l2.get(key, version=version)
+            if value is None:
+                return default
+            self._l1_set(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        if any(self._in_l1(key) for key in keys):
+            self._check_epoch()
+            for key in keys:
+                if self._in_l1(key):
+                    value = self._l1_get(key, version)
+                    if value is not None:
+                        found[key] = value
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.l2.get_many(missing, version=version)
+            for key, value in fetched.items():
+                if self._in_l1(key):
+                    self._l1_set(key, value, DEFAULT_TIMEOUT, version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        if self._in_l1(key):
+            self._l1_set(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version)
+        for key, value in data.items():
+            if self._in_l1(key) and key not in failed:
+                self._l1_set(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added and self._in_l1(key):
+            self._l1_set(key, value, timeout, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(key, version)
+        self.l2.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1_delete(key, version)
+        self.l2.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_delete(key, version)
+        return self.l2.incr(key, delta, version)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.l2.clear()
+        self._epoch = time.time_ns()
+        self._epoch_checked = time.monotonic()
+        self.l2.set(self.EPOCH_KEY, self._epoch, None)
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша фрагментов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fragments', nargs='*',
+            help='Имена фрагментов, по умолчанию settings.CACHED_FRAGMENTS'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода'
+        )
+
+    def handle(self, *args, **options):
+        fragments = options['fragments'] or settings.CACHED_FRAGMENTS
+        for name, (hits, misses) in get_stats(fragments).items():
+            total = hits + misses
+            rate = hits / total * 100 if total else 0
+            self.stdout.write(
+                f'{name}: попаданий {hits}, промахов {misses}, '
+                f'hit rate {rate:.1f}%'
+            )
+        if options['reset']:
+            reset_stats(fragments)
@@ -1,15 +1,33 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.html import linebreaks
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
 
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 200
+
 
 class CreatedModel(models.Model):
     text = models.TextField(
         'Текст',
         help_text='Введите текст'
     )
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        default='',
+        editable=False
+    )
+    excerpt = models.CharField(
+        'Отрывок',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        default='',
+        editable=False
+    )
     pub_date = models.DateTimeField(
         'Дата создания',
         auto_now_add=True,
@@ -27,3 +45,24 @@ class CreatedModel(models.Model):
 
     def __str__(self):
         return self.text[:30]
+
+    def render_text(self):
+        self.text_html = linebreaks(self.text, autoescape=True)
+        self.excerpt = Truncator(' '.join(self.text.split())).chars(
+            EXCERPT_LENGTH)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'text_html', 'excerpt'}
+        super().save(*args, **kwargs)
+
+    @property
+    def rendered_text(self):
+        # Строки из bulk_create ещё не прошли через save().
+        if self.text_html or not self.text:
+            return mark_safe(self.text_html)
+        return mark_safe(linebreaks(self.text, autoescape=True))
@@ -0,0 +1,150 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+
+from core.cache import make_fragment_key
+
+
+HOLE_START = '<!--page-hole:{}-->'
+HOLE_END = '<!--/page-hole-->'
+HOLE_RE = re.compile(r'<!--page-hole:(\d+)-->(.*?)<!--/page-hole-->',
+                     re.DOTALL)
+# Заголовки, которые пересчитываются для каждого ответа.
+SKIPPED_HEADERS = {'content-length', 'etag'}
+
+
+def mark_hole(request, template_name, context, html):
+    """Отмечает в странице шаблон, который дорисовывается пользователю."""
+    holes = getattr(request, 'page_holes', None)
+    if holes is None:
+        return html
+    holes.append((template_name, context))
+    return mark_safe(
+        HOLE_START.format(len(holes) - 1) + html + HOLE_END)
+
+
+def strip_holes(content):
+    return HOLE_RE.sub(r'\2', content)
+
+
+def fill_holes(request, entry):
+    def render(match):
+        template_name, context = entry['holes'][int(match.group(1))]
+        return render_to_string(template_name, context, request)
+    return HOLE_RE.sub(render, entry['content'])
+
+
+class PageCacheMiddleware:
+    """Кэш целых страниц из PAGE_CACHE_VIEWS для анонимов.
+
+    Ключ собирается из пути, параметров PAGE_CACHE_QUERY_PARAMS и поколений
+    PAGE_CACHE_GENERATIONS. Страницы с другими параметрами не кэшируются,
+    чтобы мусорные адреса не вытесняли настоящие. Запрос без сессионной
+    куки получает страницу до сессий, аутентификации и базы. Вошедшим
+    страницы из
+    PAGE_CACHE_SHARED_VIEWS отдаются из того же кэша, но шаблоны,
+    подключённые тегом page_hole, рендерятся для них заново.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        view_name = self.get_view_name(request)
+        if view_name is None:
+            return self.get_response(request)
+        key = self.get_key(request)
+        if key is None:
+            return self.get_response(request)
+        anonymous = settings.SESSION_COOKIE_NAME not in request.COOKIES
+        if anonymous:
+            entry = cache.get(key)
+            if entry is not None:
+                return self.anonymous_response(request, entry)
+        request.page_cache = (view_name, key, anonymous)
+        request.page_holes = []
+        response = self.get_response(request)
+        if getattr(response, 'page_cache_hit', False):
+            return response
+        if self.is_cacheable(request, response):
+            cache.set(key, {
+                'content': response.content.decode(response.charset),
+                'headers': [
+                    (header, value) for header, value in response.items()
+                    if header.lower() not in SKIPPED_HEADERS
+                ],
+                'etag': response.get('ETag'),
+                'holes': request.page_holes,
+            }, settings.PAGE_CACHE_TIMEOUT)
+        if request.page_holes and not response.streaming:
+            response.content = strip_holes(
+                response.content.decode(response.charset))
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = len(response.content)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name, key, anonymous = getattr(
+            request, 'page_cache', (None, None, True))
+        if anonymous or (request.user.is_authenticated and view_name
+                         not in settings.PAGE_CACHE_SHARED_VIEWS):
+            return None
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if not request.user.is_authenticated:
+            return self.anonymous_response(request, entry)
+        response = self.make_response(fill_holes(request, entry), entry)
+        response.page_cache_hit = True
+        return response
+
+    def get_view_name(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        if view_name not in settings.PAGE_CACHE_VIEWS:
+            return None
+        return view_name
+
+    def get_key(self, request):
+        params = sorted(request.GET.lists())
+        if any(name not in settings.PAGE_CACHE_QUERY_PARAMS
+               for name, _ in params):
+            return None
+        return make_fragment_key(
+            'page', settings.PAGE_CACHE_GENERATIONS,
+            [request.path, urlencode(params, doseq=True)])
+
+    def is_cacheable(self, request, response):
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.user.is_authenticated
+        )
+
+    def make_response(self, content, entry):
+        response = HttpResponse(content)
+        for header, value in entry['headers']:
+            response[header] = value
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def anonymous_response(self, request, entry):
+        response = self.make_response(strip_holes(entry['content']), entry)
+        if entry['etag']:
+            response['ETag'] = entry['etag']
+        response.page_cache_hit = True
+        return get_conditional_response(
+            request, etag=entry['etag'], response=response)
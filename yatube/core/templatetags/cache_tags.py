@@ -0,0 +1,132 @@
+from django import template
+from django.template.base import token_kwargs
+
+from core.cache import (fetch, get_vary_values, make_fragment_key,
+                        make_stale_key, record_lookup)
+from core.page_cache import mark_hole
+
+
+register = template.Library()
+
+HOLE_MARKER = '\x00hole:{}\x00'
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, generations, vary_on,
+                 dimensions=None, timeout=None):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.generations = generations
+        self.vary_on = vary_on
+        self.dimensions = dimensions
+        self.timeout = timeout
+        self.holes = nodelist.get_nodes_by_type(NoCacheNode)
+
+    def get_vary_on(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        if self.dimensions is not None:
+            vary_on += get_vary_values(
+                context['request'], self.dimensions.resolve(context).split())
+        return vary_on
+
+    def render(self, context):
+        fragment_name = self.fragment_name.resolve(context)
+        vary_on = self.get_vary_on(context)
+        key = make_fragment_key(
+            fragment_name, self.generations.resolve(context).split(), vary_on)
+        timeout = None
+        if self.timeout is not None:
+            timeout = int(self.timeout.resolve(context))
+
+        def render_fragment():
+            with context.push(_cache_holes_owner=self):
+                return self.nodelist.render(context)
+
+        value, hit = fetch(key, render_fragment, timeout,
+                           make_stale_key(fragment_name, vary_on))
+        record_lookup(fragment_name, hit)
+        return self.fill_holes(value, context)
+
+    def fill_holes(self, value, context):
+        for index, hole in enumerate(self.holes):
+            marker = HOLE_MARKER.format(index)
+            if marker in value:
+                value = value.replace(marker, hole.nodelist.render(context))
+        return value
+
+
+class NoCacheNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        owner = context.get('_cache_holes_owner')
+        if owner is not None and self in owner.holes:
+            return HOLE_MARKER.format(owner.holes.index(self))
+        return self.nodelist.render(context)
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser, token):
+    """Кэширует фрагмент, пока не сменится одно из поколений.
+
+        {% versioned_cache 'index_page' 'posts groups' vary='auth page' %}
+        ...
+        {% nocache %}{{ user.username }}{% endnocache %}
+        ...
+        {% endversioned_cache %}
+
+    vary перечисляет измерения из core.cache.VARY_DIMENSIONS, остальные
+    позиционные аргументы тоже попадают в ключ. timeout задаёт срок в
+    секундах, без него фрагмент живёт до смены поколений. Пока один
+    запрос пересобирает фрагмент, другие получают прежний. Блоки nocache
+    внутри фрагмента рендерятся при каждом запросе и должны лежать в том
+    же шаблоне, что и сам тег.
+    """
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает минимум два аргумента: "
+            'имя фрагмента и список поколений.'
+        )
+    vary_on = []
+    remaining = bits[3:]
+    while remaining and '=' not in remaining[0]:
+        vary_on.append(parser.compile_filter(remaining.pop(0)))
+    options = token_kwargs(remaining, parser)
+    if remaining or set(options) - {'vary', 'timeout'}:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' понимает только именованные аргументы "
+            'vary и timeout.')
+    return VersionedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        vary_on,
+        options.get('vary'),
+        options.get('timeout'),
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_hole(context, template_name, **kwargs):
+    """Подключает шаблон, который кэш страниц рендерит каждому заново.
+
+        {% page_hole 'posts/includes/switcher.html' index=True %}
+
+    Шаблон получает только переданные аргументы и контекст-процессоры.
+    """
+    template = context.template.engine.get_template(template_name)
+    with context.push(**kwargs):
+        html = template.render(context)
+    return mark_hole(context.get('request'), template_name, kwargs, html)
+
+
+@register.tag('nocache')
+def do_nocache(parser, token):
+    """Дыра в кэшированном фрагменте, которая рендерится каждый раз."""
+    nodelist = parser.parse(('endnocache',))
+    parser.delete_first_token()
+    return NoCacheNode(nodelist)
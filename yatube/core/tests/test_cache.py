@@ -0,0 +1,171 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.cache import (LOCK_KEY, bump_generation, fetch, get_generation,
+                        get_stats, make_fragment_key)
+
+
+User = get_user_model()
+
+
+class VersionedCacheTests(TestCase):
+    template = Template(
+        "{% load cache_tags %}"
+        "{% versioned_cache 'test_fragment' 'test' number %}"
+        "{{ value }}"
+        "{% endversioned_cache %}"
+    )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, value, number=1):
+        return self.template.render(Context({'value': value,
+                                             'number': number}))
+
+    def test_fragment_lives_until_generation_bump(self):
+        """Фрагмент живёт до смены поколения."""
+        self.assertEqual(self.render('первый'), 'первый')
+        self.assertEqual(self.render('второй'), 'первый')
+        self.assertEqual(self.render('второй', number=2), 'второй')
+        bump_generation('test')
+        self.assertEqual(self.render('второй'), 'второй')
+
+    def test_generation_survives_cache_clear(self):
+        """После очистки кэша поколение не возвращается к старому."""
+        generation = get_generation('test')
+        cache.clear()
+        self.assertNotEqual(get_generation('test'), generation)
+
+    def test_stats(self):
+        """Проверка счётчиков попаданий и промахов."""
+        self.render('первый')
+        self.render('первый')
+        self.render('первый')
+        self.assertEqual(get_stats(['test_fragment']),
+                         {'test_fragment': (2, 1)})
+        out = StringIO()
+        call_command('cache_stats', 'test_fragment', '--reset', stdout=out)
+        self.assertIn('попаданий 2, промахов 1', out.getvalue())
+        self.assertEqual(get_stats(['test_fragment']),
+                         {'test_fragment': (0, 0)})
+
+
+class StampedeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(return_value='новое')
+
+    def lock(self, key):
+        cache.add(LOCK_KEY.format(key), 1)
+
+    def test_single_flight_serves_stale(self):
+        """Пока другой запрос пересчитывает, отдаётся прежнее значение."""
+        fetch('fragment:old', lambda: 'старое', stale_key='stale:test')
+        self.lock('fragment:new')
+        self.assertEqual(
+            fetch('fragment:new', self.compute, stale_key='stale:test'),
+            ('старое', True)
+        )
+        self.compute.assert_not_called()
+
+    def test_expired_value_is_served_while_locked(self):
+        """Истёкшее значение отдаётся, пока пересчёт занят."""
+        cache.set('fragment:key', ('старое', time.time() - 1, 0.001))
+        self.lock('fragment:key')
+        self.assertEqual(fetch('fragment:key', self.compute, timeout=10),
+                         ('старое', True))
+        cache.delete(LOCK_KEY.format('fragment:key'))
+        self.assertEqual(fetch('fragment:key', self.compute, timeout=10),
+                         ('новое', False))
+        self.compute.assert_called_once()
+
+    def test_early_refresh(self):
+        """XFetch обновляет значение до срока, если пересчёт дорог."""
+        now = time.time()
+        cache.set('fragment:key', ('старое', now + 5, 0.001))
+        with mock.patch('core.cache.random.random', return_value=0.5):
+            self.assertEqual(fetch('fragment:key', self.compute, 10),
+                             ('старое', True))
+        cache.set('fragment:key', ('старое', now + 5, 10))
+        with mock.patch('core.cache.random.random', return_value=0.5):
+            self.assertEqual(fetch('fragment:key', self.compute, 10),
+                             ('новое', False))
+
+    @override_settings(CACHE_LOCK_WAIT=0)
+    def test_computes_when_lock_is_stuck(self):
+        """Без значения и без ответа от держателя блокировки считаем сами."""
+        self.lock('fragment:key')
+        self.assertEqual(fetch('fragment:key', self.compute),
+                         ('новое', False))
+        self.assertTrue(cache.get(LOCK_KEY.format('fragment:key')))
+
+    def test_fragment_timeout(self):
+        """Фрагмент с timeout пересобирается по истечении срока."""
+        template = Template(
+            "{% load cache_tags %}"
+            "{% versioned_cache 'test_fragment' 'test' timeout=20 %}"
+            "{{ value }}"
+            "{% endversioned_cache %}"
+        )
+        self.assertEqual(
+            template.render(Context({'value': 'первый'})), 'первый')
+        self.assertEqual(
+            template.render(Context({'value': 'второй'})), 'первый')
+        key = make_fragment_key('test_fragment', ['test'])
+        value, refresh_at, delta = cache.get(key)
+        cache.set(key, (value, time.time() - 1, delta))
+        self.assertEqual(
+            template.render(Context({'value': 'второй'})), 'второй')
+
+
+class UserAwareCacheTests(TestCase):
+    template = Template(
+        "{% load cache_tags %}"
+        "{% versioned_cache 'test_fragment' 'test' vary='auth' %}"
+        "{{ value }}|{% nocache %}{{ user.username }}{% endnocache %}"
+        "{% endversioned_cache %}"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def render(self, value, user):
+        request = self.factory.get('/')
+        request.user = user
+        return self.template.render(Context({'value': value, 'user': user,
+                                             'request': request}))
+
+    def test_vary_on_auth(self):
+        """Анонимы и авторизованные получают разные фрагменты."""
+        user = User(username='test_user')
+        self.assertEqual(self.render('аноним', AnonymousUser()), 'аноним|')
+        self.assertEqual(self.render('свой', user), 'свой|test_user')
+        self.assertEqual(self.render('другой', AnonymousUser()), 'аноним|')
+
+    def test_hole_is_rendered_live(self):
+        """Дыра в фрагменте рендерится для каждого пользователя."""
+        first = User(username='first_user')
+        second = User(username='second_user')
+        self.assertEqual(self.render('общий', first), 'общий|first_user')
+        self.assertEqual(self.render('другой', second), 'общий|second_user')
+
+    def test_unknown_dimension(self):
+        """Неизвестное измерение — ошибка."""
+        template = Template(
+            "{% load cache_tags %}"
+            "{% versioned_cache 'test_fragment' 'test' vary='weather' %}"
+            "{% endversioned_cache %}"
+        )
+        request = self.factory.get('/')
+        with self.assertRaises(ValueError):
+            template.render(Context({'request': request}))
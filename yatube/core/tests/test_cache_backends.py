@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.cache_backends import LockedFileBasedCache, TwoTierCache
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'two-tier-tests',
+    },
+})
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def make_cache(self, **options):
+        # Каждый экземпляр изображает отдельный процесс со своим L1.
+        return TwoTierCache('', {
+            'OPTIONS': {'L2': 'shared', 'L1_EPOCH_INTERVAL': 0, **options},
+        })
+
+    def test_l1_serves_versioned_keys(self):
+        """Ключи фрагментов читаются из L1 без обращения к L2."""
+        cache = self.make_cache()
+        cache.set('fragment:index:1', 'html')
+        with mock.patch.object(caches['shared'], 'get') as l2_get:
+            self.assertEqual(cache._l1_get('fragment:index:1', None), 'html')
+            l2_get.assert_not_called()
+        self.assertEqual(caches['shared'].get('fragment:index:1'), 'html')
+        other = self.make_cache()
+        self.assertEqual(other.get('fragment:index:1'), 'html')
+        self.assertEqual(
+            other.get_many(['fragment:index:1', 'fragment:missing']),
+            {'fragment:index:1': 'html'}
+        )
+
+    def test_shared_keys_bypass_l1(self):
+        """Поколения и счётчики всегда берутся из общего L2."""
+        first = self.make_cache()
+        second = self.make_cache()
+        first.set('generation:posts', 1, None)
+        self.assertEqual(second.get('generation:posts'), 1)
+        second.incr('generation:posts')
+        self.assertEqual(first.get('generation:posts'), 2)
+        self.assertEqual(len(first._l1), 0)
+
+    def test_lru_eviction(self):
+        """L1 не растёт больше L1_MAX_ENTRIES, вытесняя давние ключи."""
+        cache = self.make_cache(L1_MAX_ENTRIES=2)
+        cache.set('fragment:a', 1)
+        cache.set('fragment:b', 2)
+        cache.get('fragment:a')
+        cache.set('fragment:c', 3)
+        self.assertIsNone(cache._l1_get('fragment:b', None))
+        self.assertEqual(cache._l1_get('fragment:a', None), 1)
+        self.assertEqual(cache.get('fragment:b'), 2)
+
+    def test_clear_reaches_other_processes(self):
+        """clear() в одном процессе сбрасывает L1 в остальных."""
+        first = self.make_cache()
+        second = self.make_cache()
+        second.set('fragment:a', 'old')
+        self.assertEqual(second.get('fragment:a'), 'old')
+        first.clear()
+        self.assertIsNone(second.get('fragment:a'))
+
+    def test_delete_and_zero_timeout(self):
+        cache = self.make_cache()
+        cache.set('fragment:a', 1)
+        cache.delete('fragment:a')
+        self.assertIsNone(cache.get('fragment:a'))
+        cache.set('fragment:a', 1, 0)
+        self.assertIsNone(cache.get('fragment:a'))
+        self.assertTrue(cache.add('fragment:b', 2))
+        self.assertFalse(cache.add('fragment:b', 3))
+        self.assertEqual(cache.get('fragment:b'), 2)
+
+
+class LockedFileBasedCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def make_cache(self):
+        return LockedFileBasedCache(self.dir, {})
+
+    def run_in_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_incr_is_not_lost(self):
+        self.make_cache().set('generation:posts', 0, None)
+
+        def bump():
+            cache = self.make_cache()
+            for _ in range(25):
+                cache.incr('generation:posts')
+
+        self.run_in_threads(bump)
+        self.assertEqual(self.make_cache().get('generation:posts'), 200)
+
+    def test_only_one_add_wins(self):
+        added = []
+
+        def lock():
+            added.append(self.make_cache().add('lock:index', 1, 10))
+
+        self.run_in_threads(lock)
+        self.assertEqual(added.count(True), 1)
+
+    def test_incr_keeps_expiry(self):
+        """incr() не ставит вечному ключу TIMEOUT по умолчанию."""
+        cache = self.make_cache()
+        cache.set('generation:posts', 1, None)
+        cache.set('fragment_stats:index:hits', 1, 1)
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            cache.incr('generation:posts')
+            self.assertEqual(cache.get('generation:posts'), 2)
+            with self.assertRaises(ValueError):
+                cache.incr('fragment_stats:index:hits')
+        cache.incr('fragment_stats:index:hits')
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            self.assertIsNone(cache.get('fragment_stats:index:hits'))
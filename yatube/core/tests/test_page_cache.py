@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.page_cache import PageCacheMiddleware
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        cls.post = Post.objects.create(author=cls.user, text='Текст поста',
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def change_text_silently(self):
+        # update() не шлёт сигналов и не меняет поколений.
+        Post.objects.filter(id=self.post.id).update(
+            text='Без сигналов', text_html='<p>Без сигналов</p>')
+
+    def test_anonymous_page_is_cached(self):
+        """Анониму повторная страница отдаётся без запросов к базе."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(response, 'page-hole')
+                with self.assertNumQueries(0):
+                    cached = self.client.get(url)
+                self.assertEqual(cached.content, response.content)
+                self.assertEqual(cached['X-Frame-Options'],
+                                 response['X-Frame-Options'])
+                self.assertIn('Cookie', cached['Vary'])
+
+    def test_unknown_query_params_are_not_cached(self):
+        """Адреса с лишними параметрами не занимают место в кэше."""
+        url = reverse('posts:index')
+        with mock.patch.object(PageCacheMiddleware, 'is_cacheable') as check:
+            self.client.get(url + '?x=1')
+            self.client.get(url + '?page=1&x=1')
+        check.assert_not_called()
+        self.client.get(url + '?page=1')
+        with self.assertNumQueries(0):
+            self.client.get(url + '?page=1')
+
+    def test_generation_bump_invalidates_page(self):
+        url = reverse('posts:post_detail', args=(self.post.id,))
+        self.client.get(url)
+        post = Post.objects.get(id=self.post.id)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(self.client.get(url), 'Новый текст')
+
+    def test_shared_page_holes_for_user(self):
+        """Вошедший получает кэш главной со своими шапкой и переключателем."""
+        self.client.get(reverse('posts:index'))
+        self.change_text_silently()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Текст поста')
+        self.assertContains(response, 'Пользователь: test_author')
+        self.assertContains(response, reverse('posts:follow_index'))
+        self.assertNotContains(response, reverse('users:login'))
+        self.assertNotContains(response, 'page-hole')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, reverse('users:login'))
+        self.assertNotContains(response, reverse('posts:follow_index'))
+
+    def test_personal_page_is_not_shared(self):
+        """Страницу поста вошедший всегда получает свежей."""
+        url = reverse('posts:post_detail', args=(self.post.id,))
+        self.client.get(url)
+        self.change_text_silently()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Без сигналов')
+        self.assertContains(response, reverse('posts:post_edit',
+                                              args=(self.post.id,)))
+        self.assertContains(self.client.get(url), 'Текст поста')
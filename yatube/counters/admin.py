@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Counter, PostViews
+
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'object_id', 'value')
+    list_filter = ('name',)
+    search_fields = ('=object_id',)
+
+
+@admin.register(PostViews)
+class PostViewsAdmin(admin.ModelAdmin):
+    list_display = ('post_id', 'views', 'unique_views')
+    exclude = ('sketch',)
+    raw_id_fields = ('post',)
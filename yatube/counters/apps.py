@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CountersConfig(AppConfig):
+    name = 'counters'
+    verbose_name = 'Счётчики'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,41 @@
+import hashlib
+import math
+
+# HyperLogLog: число различных значений оценивается по скетчу
+# фиксированного размера, 2 ** PRECISION байт, с ошибкой около 3 %.
+PRECISION = 10
+REGISTERS = 1 << PRECISION
+_REST_BITS = 64 - PRECISION
+
+
+def empty():
+    return bytes(REGISTERS)
+
+
+def register(value):
+    """Регистр и ранг, которые значение value пишет в скетч."""
+    digest = hashlib.sha1(str(value).encode()).digest()
+    hashed = int.from_bytes(digest[:8], 'big')
+    rest = hashed & ((1 << _REST_BITS) - 1)
+    return hashed >> _REST_BITS, _REST_BITS - rest.bit_length() + 1
+
+
+def merge(sketch, updates):
+    """Скетч с учётом пар (регистр, ранг) из updates."""
+    registers = bytearray(sketch or empty())
+    for index, rank in updates:
+        if rank > registers[index]:
+            registers[index] = rank
+    return bytes(registers)
+
+
+def estimate(sketch):
+    if not sketch:
+        return 0
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS ** 2 / sum(2.0 ** -rank for rank in sketch)
+    zeros = sketch.count(0)
+    if raw <= 2.5 * REGISTERS and zeros:
+        # На малых числах точнее линейный подсчёт пустых регистров.
+        return round(REGISTERS * math.log(REGISTERS / zeros))
+    return round(raw)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from counters.utils import SOURCES, reconcile
+from tasks.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Сверяет денормализованные счётчики с таблицами и чинит расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help='Сверить только эти счётчики: ' + ', '.join(SOURCES)
+        )
+        parser.add_argument(
+            '--defer', action='store_true',
+            help='Поставить сверку в очередь задач вместо выполнения'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(SOURCES)
+        if unknown:
+            raise CommandError(
+                'Неизвестные счётчики: ' + ', '.join(sorted(unknown)))
+        if options['defer']:
+            job = enqueue(reconcile, options['names'] or None)
+            self.stdout.write(f'Сверка поставлена в очередь: задача {job.pk}')
+            return
+        for name, fixed in reconcile(options['names']).items():
+            self.stdout.write(f'{name}: исправлено {fixed}')
+        self.stdout.write(self.style.SUCCESS('Счётчики сверены'))
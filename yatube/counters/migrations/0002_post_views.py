@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_is_deleted'),
+        ('counters', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViews',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_stats', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+                ('unique_views', models.PositiveIntegerField(default=0, verbose_name='Уникальные зрители')),
+                ('sketch', models.BinaryField(default=b'', verbose_name='Скетч HyperLogLog зрителей')),
+            ],
+            options={
+                'verbose_name': 'Просмотры поста',
+                'verbose_name_plural': 'Просмотры постов',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class Counter(models.Model):
+    name = models.CharField('Счётчик', max_length=32)
+    object_id = models.PositiveIntegerField('Объект')
+    value = models.IntegerField('Значение', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик'
+        verbose_name_plural = 'Счётчики'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'object_id'],
+                name='unique_counter'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}:{self.object_id} = {self.value}'
+
+
+class PostViews(models.Model):
+    post = models.OneToOneField(
+        'posts.Post',
+        verbose_name='Пост',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='view_stats'
+    )
+    views = models.PositiveIntegerField('Просмотры', default=0)
+    unique_views = models.PositiveIntegerField(
+        'Уникальные зрители', default=0)
+    sketch = models.BinaryField('Скетч HyperLogLog зрителей', default=b'')
+
+    class Meta:
+        verbose_name = 'Просмотры поста'
+        verbose_name_plural = 'Просмотры постов'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.views} ({self.unique_views})'
@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import Counter as Tally, defaultdict
+
+from django import db
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from posts.models import Post
+from tasks.jobs import enqueue
+
+from . import hll
+from .models import PostViews
+
+SEQ_KEY = 'post_views:{}:seq'
+ENTRY_KEY = 'post_views:{}:{}'
+SCHEDULED_KEY = 'post_views:{}:scheduled'
+CLAIMED_KEY = 'post_views:{}:claimed'
+FLUSHED_KEY = 'post_views:flushed'
+
+# Просмотры, накопленные этим процессом: {пост: [просмотры, {регистр: ранг}]}.
+_buffer = {}
+_lock = threading.Lock()
+_timer = None
+
+
+def current_epoch():
+    """Номер окна в VIEW_FLUSH_INTERVAL секунд, куда пишутся просмотры."""
+    return int(time.time() // settings.VIEW_FLUSH_INTERVAL)
+
+
+def viewer_id(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        return f'session:{session}'
+    return 'anon:{}:{}'.format(request.META.get('REMOTE_ADDR', ''),
+                               request.META.get('HTTP_USER_AGENT', ''))
+
+
+def record_view(post_id, viewer):
+    """Копит просмотр в памяти процесса, не трогая ни кэш, ни базу.
+
+    Раз в VIEW_FLUSH_INTERVAL фоновый поток переносит накопленное
+    в кэш через push_views().
+    """
+    global _timer
+    index, rank = hll.register(viewer)
+    with _lock:
+        entry = _buffer.setdefault(post_id, [0, {}])
+        entry[0] += 1
+        if rank > entry[1].get(index, 0):
+            entry[1][index] = rank
+        if _timer is None:
+            _timer = threading.Timer(settings.VIEW_FLUSH_INTERVAL,
+                                     _push_in_background)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _push_in_background():
+    try:
+        push_views()
+    finally:
+        # У потока своё соединение с базой, после enqueue его закрываем.
+        db.connections.close_all()
+
+
+def push_views():
+    """Переносит просмотры процесса в кэш одной записью в текущее окно.
+
+    Номер записи выдаёт атомарный cache.incr(), поэтому записи разных
+    процессов не перетирают друг друга. Первая запись в окне ставит
+    в очередь задачу, которая сбросит окно после его окончания.
+    """
+    global _buffer, _timer
+    with _lock:
+        buffered, _buffer, _timer = _buffer, {}, None
+    if not buffered:
+        return
+    epoch = current_epoch()
+    ttl = settings.VIEW_BUFFER_TTL
+    seq_key = SEQ_KEY.format(epoch)
+    cache.add(seq_key, 0, ttl)
+    number = cache.incr(seq_key)
+    cache.set(ENTRY_KEY.format(epoch, number), buffered, ttl)
+    if cache.add(SCHEDULED_KEY.format(epoch), 1, ttl):
+        # flush_views доберётся до окна epoch, только когда закончится
+        # и следующее за ним.
+        enqueue(flush_views, delay=2 * settings.VIEW_FLUSH_INTERVAL)
+
+
+def _collect(epoch):
+    """Забирает из кэша просмотры окна: (счётчики, регистры) по постам."""
+    seq_key = SEQ_KEY.format(epoch)
+    keys = [ENTRY_KEY.format(epoch, number)
+            for number in range(1, (cache.get(seq_key) or 0) + 1)]
+    views = Tally()
+    registers = defaultdict(list)
+    for buffered in cache.get_many(keys).values():
+        for post_id, (count, ranks) in buffered.items():
+            views[post_id] += count
+            registers[post_id] += ranks.items()
+    cache.delete_many(keys + [seq_key])
+    return views, registers
+
+
+def flush_views(until=None):
+    """Переносит накопленные просмотры в PostViews.
+
+    Сбрасываются закончившиеся окна до until. По умолчанию это все окна,
+    кроме текущего и предыдущего: в только что закончившееся окно ещё
+    может писать push_views(), начатый до его конца. Каждое окно
+    забирает только одна задача. Все видимые посты пишутся одной
+    транзакцией через bulk_update. Возвращает количество обновлённых
+    постов.
+    """
+    until = current_epoch() - 1 if until is None else until
+    lookback = settings.VIEW_BUFFER_TTL // settings.VIEW_FLUSH_INTERVAL
+    flushed = cache.get(FLUSHED_KEY)
+    start = until - lookback if flushed is None else flushed + 1
+    views = Tally()
+    registers = defaultdict(list)
+    for epoch in range(max(start, until - lookback), until):
+        if cache.add(CLAIMED_KEY.format(epoch), 1,
+                     settings.VIEW_BUFFER_TTL):
+            epoch_views, epoch_registers = _collect(epoch)
+            views.update(epoch_views)
+            for post_id, updates in epoch_registers.items():
+                registers[post_id] += updates
+    cache.set(FLUSHED_KEY, until - 1, None)
+    if not views:
+        return 0
+    with transaction.atomic():
+        post_ids = set(Post.objects.visible().filter(
+            pk__in=list(views)).values_list('pk', flat=True))
+        PostViews.objects.bulk_create(
+            [PostViews(post_id=post_id) for post_id in post_ids],
+            ignore_conflicts=True)
+        rows = list(PostViews.objects.filter(post_id__in=post_ids))
+        for row in rows:
+            row.views += views[row.post_id]
+            row.sketch = hll.merge(row.sketch, registers[row.post_id])
+            row.unique_views = hll.estimate(row.sketch)
+        PostViews.objects.bulk_update(
+            rows, ('views', 'unique_views', 'sketch'), batch_size=500)
+    return len(post_ids)
+
+
+def get_views(post_id):
+    """Просмотры и уникальные зрители поста на момент последнего сброса.
+
+    Для скрытого или несуществующего поста возвращает None.
+    """
+    stats = Post.objects.visible().filter(pk=post_id).values_list(
+        'view_stats__views', 'view_stats__unique_views').order_by()
+    row = next(iter(stats), None)
+    if row is None:
+        return None
+    return tuple(value or 0 for value in row)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+from posts.models import Comment, Follow, Post
+
+from . import utils
+from .models import Counter
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._counted_group_id = (
+        Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        utils.increment(utils.TOTAL_POSTS)
+        utils.increment(utils.USER_POSTS, instance.author_id)
+        utils.increment(utils.GROUP_POSTS, instance.group_id)
+        return
+    old_group_id = getattr(instance, '_counted_group_id', None)
+    if old_group_id != instance.group_id:
+        utils.increment(utils.GROUP_POSTS, old_group_id, -1)
+        utils.increment(utils.GROUP_POSTS, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    Counter.objects.filter(name=utils.POST_COMMENTS,
+                           object_id=instance.pk).delete()
+    # Скрытый пост вычли из счётчиков, когда скрывали.
+    if instance.is_deleted or not User.objects.filter(
+            pk=instance.author_id, is_active=True).exists():
+        return
+    utils.increment(utils.TOTAL_POSTS, delta=-1)
+    utils.increment(utils.USER_POSTS, instance.author_id, -1)
+    utils.increment(utils.GROUP_POSTS, instance.group_id, -1)
+
+
+@receiver(pre_save, sender=User)
+def remember_active(sender, instance, update_fields=None, **kwargs):
+    instance._counted_active = (
+        User.objects.filter(pk=instance.pk).values_list(
+            'is_active', flat=True).first()
+        if instance.pk and (update_fields is None
+                            or 'is_active' in update_fields) else None
+    )
+
+
+@receiver(post_save, sender=User)
+def user_active_changed(sender, instance, created, **kwargs):
+    was_active = getattr(instance, '_counted_active', None)
+    if was_active is None or was_active == instance.is_active:
+        return
+    utils.increment_posts(
+        Post.objects.filter(author_id=instance.pk, is_deleted=False),
+        1 if instance.is_active else -1)
+    # Посты и комментарии пользователя пропадают или возвращаются сразу,
+    # как при soft_delete_users().
+    bump_generation('posts', 'comments', 'users')
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        utils.increment(utils.USER_FOLLOWERS, instance.author_id)
+        utils.increment(utils.USER_FOLLOWING, instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    utils.increment(utils.USER_FOLLOWERS, instance.author_id, -1)
+    utils.increment(utils.USER_FOLLOWING, instance.user_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        utils.increment(utils.POST_COMMENTS, instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    utils.increment(utils.POST_COMMENTS, instance.post_id, -1)
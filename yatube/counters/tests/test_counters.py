@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from counters import utils
+from counters.models import Counter
+from posts.models import Comment, Follow, Group, Post
+from tasks import jobs
+from tasks.models import Job
+
+
+User = get_user_model()
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Текст тестового поста',
+            group=cls.group
+        )
+
+    def test_post_counters(self):
+        """Проверка счётчиков постов."""
+        Post.objects.create(author=self.author, text='Второй пост',
+                            group=self.group)
+        self.assertEqual(utils.get_count(utils.USER_POSTS, self.author.id), 2)
+        self.assertEqual(utils.get_count(utils.GROUP_POSTS, self.group.id), 2)
+        self.assertEqual(utils.get_count(utils.TOTAL_POSTS), 2)
+        self.post.group = None
+        self.post.save()
+        self.assertEqual(utils.get_count(utils.GROUP_POSTS, self.group.id), 1)
+        Post.objects.filter(group=self.group).delete()
+        self.assertEqual(utils.get_count(utils.USER_POSTS, self.author.id), 1)
+        self.assertEqual(utils.get_count(utils.TOTAL_POSTS), 1)
+
+    def test_follow_and_comment_counters(self):
+        """Проверка счётчиков подписок и комментариев."""
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        Comment.objects.create(post=self.post, author=self.user, text='Ок')
+        self.assertEqual(
+            utils.get_count(utils.USER_FOLLOWERS, self.author.id), 1)
+        self.assertEqual(
+            utils.get_count(utils.USER_FOLLOWING, self.user.id), 1)
+        self.assertEqual(utils.get_count(utils.POST_COMMENTS, self.post.id), 1)
+        follow.delete()
+        self.assertEqual(
+            utils.get_count(utils.USER_FOLLOWERS, self.author.id), 0)
+
+    def test_profile_reads_counters(self):
+        """Страница профиля берёт числа из счётчиков."""
+        Follow.objects.create(user=self.user, author=self.author)
+        Counter.objects.filter(name=utils.USER_FOLLOWERS).update(value=42)
+        response = Client().get(reverse('posts:profile',
+                                        args=(self.author.username,)))
+        self.assertEqual(response.context['followers_count'], 42)
+        self.assertContains(response, 'Всего подписчиков: 42')
+
+    def test_reconcile(self):
+        """Проверка исправления расхождений."""
+        utils.get_count(utils.USER_POSTS, self.author.id)
+        Counter.objects.filter(name=utils.USER_POSTS).update(value=100)
+        Post.objects.bulk_create([Post(author=self.author, text='Пост')])
+        out = StringIO()
+        call_command('reconcile_counters', utils.USER_POSTS, stdout=out)
+        self.assertEqual(utils.get_count(utils.USER_POSTS, self.author.id), 2)
+        self.assertIn(f'{utils.USER_POSTS}: исправлено 1', out.getvalue())
+
+    def test_reconcile_counters_defer(self):
+        """Сверку можно отложить в очередь задач."""
+        Counter.objects.filter(name=utils.USER_POSTS).update(value=100)
+        call_command('reconcile_counters', utils.USER_POSTS, '--defer',
+                     stdout=StringIO())
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'counters.utils.reconcile')
+        self.assertEqual(jobs.claim('default', 1), [job.id])
+        self.assertTrue(jobs.execute(job.id))
+        self.assertEqual(utils.get_count(utils.USER_POSTS, self.author.id), 1)
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from counters import hll
+from counters.models import PostViews
+from counters.post_views import flush_views, push_views, record_view
+from posts.models import Post
+from tasks.models import Job
+
+
+User = get_user_model()
+
+
+class PostViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+        cls.other = Post.objects.create(author=cls.author, text='Другой')
+
+    def setUp(self):
+        timer = mock.patch('counters.post_views.threading.Timer')
+        self.timer = timer.start()
+        self.addCleanup(timer.stop)
+        # Не оставляет просмотры в памяти процесса следующим тестам.
+        self.addCleanup(push_views)
+        cache.clear()
+
+    def push(self, epoch):
+        with mock.patch('counters.post_views.current_epoch',
+                        return_value=epoch):
+            push_views()
+
+    def test_views_are_buffered_and_flushed(self):
+        """Просмотры попадают в базу одним сбросом после окна."""
+        with self.assertNumQueries(0):
+            for viewer in ('a', 'b', 'a', 'c'):
+                record_view(self.post.id, viewer)
+        self.timer.assert_called_once()
+        self.assertIsNone(cache.get('post_views:100:seq'))
+        self.push(100)
+        # Записи разных процессов в одном окне не перетирают друг друга.
+        record_view(self.post.id, 'a')
+        record_view(self.other.id, 'a')
+        record_view(self.other.id + 100, 'a')
+        self.push(100)
+        self.assertFalse(PostViews.objects.exists())
+        self.assertEqual(Job.objects.filter(
+            task='counters.post_views.flush_views').count(), 1)
+        record_view(self.post.id, 'd')
+        self.push(101)
+        with self.assertNumQueries(6):
+            self.assertEqual(flush_views(until=101), 2)
+        stats = PostViews.objects.get(post=self.post)
+        self.assertEqual((stats.views, stats.unique_views), (5, 3))
+        self.assertEqual(PostViews.objects.get(post=self.other).views, 1)
+        self.assertEqual(flush_views(until=101), 0)
+        flush_views(until=102)
+        stats.refresh_from_db()
+        self.assertEqual((stats.views, stats.unique_views), (6, 4))
+
+    def test_view_endpoint(self):
+        """Счётчики приходят ответом на запрос, а не в странице из кэша."""
+        url = reverse('posts:post_view', args=(self.post.id,))
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(url).json(),
+                         {'views': 0, 'unique_views': 0})
+        self.push(100)
+        flush_views(until=101)
+        self.assertEqual(self.client.post(url).json(),
+                         {'views': 1, 'unique_views': 1})
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,)))
+        self.assertContains(response, url)
+        self.assertContains(response, 'data-post-views hidden')
+
+    def test_hidden_posts_are_not_counted(self):
+        """Просмотры скрытых и несуществующих постов не копятся."""
+        Post.objects.filter(id=self.other.id).update(is_deleted=True)
+        for post_id in (self.other.id, self.other.id + 100):
+            url = reverse('posts:post_view', args=(post_id,))
+            self.assertEqual(self.client.post(url).status_code, 404)
+        record_view(self.post.id, 'a')
+        self.push(100)
+        Post.objects.filter(id=self.post.id).update(is_deleted=True)
+        self.assertEqual(flush_views(until=101), 0)
+        self.assertFalse(PostViews.objects.exists())
+
+    def test_flush_skips_last_finished_window(self):
+        """Окно сбрасывается, только когда закончится и следующее."""
+        record_view(self.post.id, 'a')
+        self.push(100)
+        with mock.patch('counters.post_views.current_epoch',
+                        return_value=101):
+            self.assertEqual(flush_views(), 0)
+        with mock.patch('counters.post_views.current_epoch',
+                        return_value=102):
+            self.assertEqual(flush_views(), 1)
+
+    def test_hll_estimate(self):
+        """Скетч фиксированного размера оценивает число зрителей."""
+        sketch = hll.merge(None, (hll.register(number)
+                                  for number in range(20000)))
+        self.assertEqual(len(sketch), hll.REGISTERS)
+        self.assertAlmostEqual(hll.estimate(sketch), 20000, delta=2000)
+        self.assertEqual(hll.estimate(hll.merge(sketch, [])),
+                         hll.estimate(sketch))
+        self.assertEqual(hll.estimate(hll.empty()), 0)
@@ -0,0 +1,119 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from posts.models import Comment, Follow, Post
+
+from .models import Counter
+
+
+USER_POSTS = 'user_posts'
+USER_FOLLOWERS = 'user_followers'
+USER_FOLLOWING = 'user_following'
+GROUP_POSTS = 'group_posts'
+POST_COMMENTS = 'post_comments'
+TOTAL_POSTS = 'total_posts'
+
+# Источник истины для каждого счётчика: записи и поле, по которому считаем.
+# Скрытые посты не считаются, как и не показываются.
+SOURCES = {
+    USER_POSTS: (Post.objects.visible, 'author'),
+    USER_FOLLOWERS: (Follow.objects.all, 'author'),
+    USER_FOLLOWING: (Follow.objects.all, 'user'),
+    GROUP_POSTS: (Post.objects.visible, 'group'),
+    POST_COMMENTS: (Comment.objects.all, 'post'),
+    TOTAL_POSTS: (Post.objects.visible, None),
+}
+
+
+def count_source(name, object_id=0):
+    records, field = SOURCES[name]
+    queryset = records()
+    if field is not None:
+        queryset = queryset.filter(**{field: object_id})
+    return queryset.count()
+
+
+def count_sources(name):
+    """Все настоящие значения счётчика одним запросом: {object_id: value}."""
+    records, field = SOURCES[name]
+    if field is None:
+        return {0: records().count()}
+    return dict(
+        records().filter(**{f'{field}__isnull': False})
+        .values_list(field).annotate(value=Count('pk')).order_by()
+    )
+
+
+def _initialize(name, object_id):
+    try:
+        with transaction.atomic():
+            return Counter.objects.create(
+                name=name, object_id=object_id,
+                value=count_source(name, object_id)
+            ).value
+    except IntegrityError:
+        return Counter.objects.get(name=name, object_id=object_id).value
+
+
+def get_count(name, object_id=0):
+    value = Counter.objects.filter(
+        name=name, object_id=object_id).values_list('value', flat=True).first()
+    if value is None:
+        return _initialize(name, object_id)
+    return value
+
+
+def increment(name, object_id=0, delta=1):
+    if object_id is None:
+        return
+    with transaction.atomic():
+        updated = Counter.objects.filter(
+            name=name, object_id=object_id).update(value=F('value') + delta)
+        if not updated:
+            # Источник уже содержит изменение: сигналы шлются после записи.
+            _initialize(name, object_id)
+
+
+def increment_posts(posts, delta):
+    """Меняет счётчики постов на delta за каждый пост из posts.
+
+    Для постов, которые скрываются или возвращаются через update(), без
+    сигналов. Вызывать после записи, как и increment().
+    """
+    posts = posts.order_by()
+    for name, field in ((USER_POSTS, 'author'), (GROUP_POSTS, 'group')):
+        for object_id, count in posts.values_list(field).annotate(
+                count=Count('pk')):
+            increment(name, object_id, delta * count)
+    total = posts.count()
+    if total:
+        increment(TOTAL_POSTS, delta=delta * total)
+
+
+def reconcile(names=None):
+    """Сверяет счётчики с источниками и исправляет расхождения.
+
+    Возвращает {имя счётчика: количество исправленных записей}.
+    """
+    fixed = {}
+    for name in names or SOURCES:
+        actual = count_sources(name)
+        stored = dict(Counter.objects.filter(name=name).values_list(
+            'object_id', 'value'))
+        fixed[name] = 0
+        with transaction.atomic():
+            for object_id, value in stored.items():
+                if actual.get(object_id, 0) != value:
+                    Counter.objects.filter(
+                        name=name, object_id=object_id
+                    ).update(value=actual.get(object_id, 0))
+                    fixed[name] += 1
+            missing = [
+                Counter(name=name, object_id=object_id, value=value)
+                for object_id, value in actual.items()
+                if object_id not in stored
+            ]
+            Counter.objects.bulk_create(missing, batch_size=500,
+                                        ignore_conflicts=True)
+            fixed[name] += len(missing)
+    return fixed
@@ -3,7 +3,10 @@ import sys
 
 
 def main():
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    # Тесты не должны читать и очищать кэш разработчика.
+    settings_module = ('yatube.test_settings' if sys.argv[1:2] == ['test']
+                       else 'yatube.settings')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
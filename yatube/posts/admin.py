@@ -1,16 +1,25 @@
 from django.contrib import admin
 
+from core.admin import BackgroundDeleteMixin, LargeTableAdminMixin
+from search.admin import FullTextSearchMixin
 from .models import Comment, Follow, Group, Post
+from .purge import soft_delete_posts
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group',)
+class PostAdmin(BackgroundDeleteMixin, LargeTableAdminMixin,
+                FullTextSearchMixin, admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group',
+                    'is_deleted')
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_deleted')
     empty_value_display = '-пусто-'
 
+    def soft_delete(self, request, pks):
+        soft_delete_posts(pks)
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
@@ -19,11 +28,16 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdminMixin, FullTextSearchMixin,
+                   admin.ModelAdmin):
     list_display = ('pk', 'text', 'author', 'post')
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
     search_fields = ('text',)
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'user', 'author')
+class FollowAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author', 'pull')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
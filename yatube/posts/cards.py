@@ -0,0 +1,46 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .thumbnails import resolve_thumbnails
+
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def card_version(post):
+    """Хэш всего, что выводится в карточке поста."""
+    group = post.group
+    parts = (
+        post.text, str(post.image), post.image_hash,
+        post.pub_date.isoformat(),
+        post.author.username, post.author.get_full_name(),
+        group.slug if group else '', group.title if group else '',
+    )
+    return hashlib.md5('\x00'.join(parts).encode()).hexdigest()
+
+
+def card_key(post):
+    return f'post_card:{post.id}:{card_version(post)}'
+
+
+def render_cards(posts):
+    """Карточки постов страницы: кэш читается одним get_many."""
+    posts = list(posts)
+    keys = [card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing_posts = {
+        key: post for key, post in zip(keys, posts) if key not in cards
+    }
+    resolve_thumbnails(missing_posts.values())
+    missing = {
+        key: render_to_string(CARD_TEMPLATE, {'post': post})
+        for key, post in missing_posts.items()
+    }
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
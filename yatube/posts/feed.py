@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import FeedEntry, Follow, Post
+
+# Ключ курсора ленты: поля записи ленты, а не поста, чтобы сортировка
+# шла по индексу (user, pub_date, post).
+FEED_KEYSET = ('feed_pub_date', 'feed_post_id')
+
+
+def is_pull_author(author):
+    """Автор, чьи посты слишком дорого раскладывать по лентам."""
+    return (
+        author.following.count() > settings.FEED_FANOUT_LIMIT
+        or author.posts.count() > settings.FEED_BACKFILL_LIMIT
+    )
+
+
+def _bulk_insert(entries):
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    followers = Follow.objects.filter(author_id=post.author_id)
+    if followers.count() > settings.FEED_FANOUT_LIMIT:
+        followers.filter(pull=False).update(pull=True)
+        return
+    user_ids = followers.filter(pull=False).values_list('user_id', flat=True)
+    _bulk_insert(
+        FeedEntry(user_id=user_id, post_id=post.id,
+                  author_id=post.author_id, pub_date=post.pub_date)
+        for user_id in user_ids.iterator()
+    )
+
+
+def backfill(follow, pull=None):
+    """Заполняет ленту подписчика постами автора при подписке.
+
+    Возвращает количество добавленных в ленту постов.
+    """
+    if pull is None:
+        pull = is_pull_author(follow.author)
+    if pull:
+        Follow.objects.filter(pk=follow.pk).update(pull=True)
+        return 0
+    posts = Post.objects.filter(author_id=follow.author_id).values_list(
+        'id', 'pub_date')
+    entries = [
+        FeedEntry(user_id=follow.user_id, post_id=post_id,
+                  author_id=follow.author_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    ]
+    _bulk_insert(entries)
+    return len(entries)
+
+
+def prune(follow):
+    """Убирает из ленты посты автора при отписке."""
+    FeedEntry.objects.filter(user_id=follow.user_id,
+                             author_id=follow.author_id).delete()
+
+
+def get_feed(user):
+    """Посты авторов, на которых подписан пользователь.
+
+    Постраничный вывод по курсору должен использовать FEED_KEYSET.
+    """
+    pull_authors = list(
+        Follow.objects.filter(user=user, pull=True).values_list(
+            'author_id', flat=True)
+    )
+    if not pull_authors:
+        # annotate() переиспользует соединение из filter(), поэтому
+        # условия курсора не добавят второй JOIN к ленте.
+        return Post.objects.visible().filter(
+            feed_entries__user=user
+        ).annotate(
+            feed_pub_date=F('feed_entries__pub_date'),
+            feed_post_id=F('feed_entries__post_id'),
+        ).order_by('-feed_pub_date', '-feed_post_id')
+    pushed = FeedEntry.objects.filter(user=user).values('post_id')
+    return Post.objects.visible().filter(
+        Q(id__in=pushed) | Q(author_id__in=pull_authors)
+    ).annotate(feed_pub_date=F('pub_date'), feed_post_id=F('id'))
+
+
+@transaction.atomic
+def rebuild_feeds(users=None):
+    """Пересобирает ленты с нуля, заново решая, кого тянуть при чтении.
+
+    Возвращает количество записанных в ленты постов.
+    """
+    follows = Follow.objects.select_related('author')
+    entries = FeedEntry.objects.all()
+    if users is not None:
+        follows = follows.filter(user__in=users)
+        entries = entries.filter(user__in=users)
+    entries.delete()
+    created = 0
+    pull_by_author = {}
+    for follow in follows.iterator():
+        if follow.author_id not in pull_by_author:
+            pull_by_author[follow.author_id] = is_pull_author(follow.author)
+        pull = pull_by_author[follow.author_id]
+        if follow.pull and not pull:
+            Follow.objects.filter(pk=follow.pk).update(pull=False)
+        created += backfill(follow, pull)
+    return created
@@ -1,6 +1,17 @@
 from django import forms
 
-from .models import Post, Comment
+from core.cache import fetch, make_fragment_key
+
+from .models import Comment, Group, Post
+
+
+def group_choices():
+    """Варианты поля group из кэша, до смены поколения groups."""
+    choices, _ = fetch(
+        make_fragment_key('group_choices', ('groups',)),
+        lambda: list(Group.objects.values_list('pk', 'title')),
+    )
+    return choices
 
 
 class PostForm(forms.ModelForm):
@@ -8,6 +19,12 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Выбранное значение всё равно проверяется запросом по pk.
+        group = self.fields['group']
+        group.choices = [('', group.empty_label), *group_choices()]
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
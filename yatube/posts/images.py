@@ -0,0 +1,51 @@
+import base64
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image
+
+
+def read_image_meta(file):
+    """Размеры, вес, хэш и крошечная заглушка изображения.
+
+    Возвращает словарь значений для полей image_* модели Post
+    или None, если файл не удалось прочитать как изображение.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            image.draft('RGB', (settings.IMAGE_PLACEHOLDER_SIZE,) * 2)
+            placeholder = image.convert('RGB')
+            placeholder.thumbnail((settings.IMAGE_PLACEHOLDER_SIZE,) * 2)
+            buffer = BytesIO()
+            placeholder.save(buffer, 'JPEG', quality=40)
+    except (OSError, ValueError):
+        return None
+    finally:
+        file.seek(0)
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_size': size,
+        'image_hash': digest.hexdigest(),
+        'image_placeholder': 'data:image/jpeg;base64,'
+        + base64.b64encode(buffer.getvalue()).decode(),
+    }
+
+
+def empty_image_meta():
+    return {
+        'image_width': None,
+        'image_height': None,
+        'image_size': None,
+        'image_hash': '',
+        'image_placeholder': '',
+    }
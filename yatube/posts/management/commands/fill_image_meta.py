@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import empty_image_meta
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет размеры, хэш и заглушки изображений постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перечитать все изображения, а не только незаполненные'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько записей обновлять одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        fields = tuple(empty_image_meta())
+        queryset = Post.objects.exclude(image='').only(
+            'id', 'image').order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(image_hash='')
+        total = 0
+        failed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            for post in batch:
+                try:
+                    post.read_image_meta()
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'{post.image.name}: {error}')
+                finally:
+                    post.image.close()
+            Post.objects.bulk_update(batch, fields)
+            total += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(
+            f'Изображений обработано: {total}, ошибок: {failed}')
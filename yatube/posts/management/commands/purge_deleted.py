@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.purge import purge_posts, purge_user
+
+
+class Command(BaseCommand):
+    help = ('Порциями удаляет посты с is_deleted и данные отключённых '
+            'пользователей')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, nargs='+', default=(),
+            help='id отключённых пользователей, которых удалить целиком'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PURGE_BATCH_SIZE,
+            help='Сколько строк удалять одной транзакцией'
+        )
+
+    def progress(self, label, deleted):
+        self.stdout.write(f'{label}: удалено {deleted}')
+
+    def handle(self, *args, **options):
+        purge_posts(batch_size=options['batch_size'], progress=self.progress)
+        for user_id in options['users']:
+            purge_user(user_id, options['batch_size'], self.progress)
+        self.stdout.write(self.style.SUCCESS('Очистка завершена'))
@@ -0,0 +1,50 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django import db
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+
+
+def _generate(image_name):
+    try:
+        generate_thumbnails(image_name)
+    except Exception as error:
+        return image_name, str(error)
+    finally:
+        db.connections.close_all()
+    return image_name, None
+
+
+class Command(BaseCommand):
+    help = 'Пересоздаёт миниатюры всех изображений постов на всех ядрах'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов, по умолчанию по числу ядер'
+        )
+
+    def handle(self, *args, **options):
+        names = list(
+            Post.objects.exclude(image='').order_by().values_list(
+                'image', flat=True).distinct()
+        )
+        # Дочерние процессы не должны делить соединение с родителем.
+        db.connections.close_all()
+        started = time.monotonic()
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [pool.submit(_generate, name) for name in names]
+            for future in as_completed(futures):
+                name, error = future.result()
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(names)}, ошибок: {failed}, '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
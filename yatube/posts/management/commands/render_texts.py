@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет готовый HTML и отрывки текстов постов и комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать все записи, а не только незаполненные'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько записей обновлять одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            queryset = model.objects.only('id', 'text').order_by('id')
+            if not options['all']:
+                queryset = queryset.filter(text_html='').exclude(text='')
+            total = 0
+            last_id = 0
+            while True:
+                batch = list(
+                    queryset.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                for obj in batch:
+                    obj.render_text()
+                model.objects.bulk_update(batch, ('text_html', 'excerpt'))
+                total += len(batch)
+                last_id = batch[-1].id
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {total}')
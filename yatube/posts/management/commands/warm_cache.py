@@ -0,0 +1,93 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django import db
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from counters.models import Counter
+from counters.utils import USER_FOLLOWERS
+from posts.models import Group
+
+User = get_user_model()
+
+
+def _render(path):
+    """Открывает страницу как аноним и возвращает (путь, код, секунды).
+
+    Запрос проходит все middleware, так что страница попадает и в кэш
+    целых страниц, из которого её потом получат анонимы.
+    """
+    started = time.monotonic()
+    try:
+        response = Client().get(path)
+        return path, response.status_code, time.monotonic() - started
+    except Exception as error:
+        return path, repr(error), time.monotonic() - started
+    finally:
+        db.connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Прогревает кэш первых страниц ленты, групп и профилей '
+            'популярных авторов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=3,
+            help='Сколько первых страниц главной прогреть'
+        )
+        parser.add_argument(
+            '--authors', type=int, default=10,
+            help='Сколько авторов с наибольшим числом подписчиков прогреть'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов, по умолчанию по числу ядер'
+        )
+
+    def get_paths(self, pages, authors):
+        index = reverse('posts:index')
+        paths = [index] + [f'{index}?page={page}'
+                           for page in range(2, pages + 1)]
+        paths += [
+            reverse('posts:group_list', args=(slug,))
+            for slug in Group.objects.values_list('slug', flat=True)
+        ]
+        popular = list(Counter.objects.filter(
+            name=USER_FOLLOWERS,
+            object_id__in=User.objects.filter(is_active=True).values('pk'),
+        ).order_by('-value', 'object_id').values_list(
+            'object_id', flat=True)[:authors])
+        usernames = dict(User.objects.filter(pk__in=popular).values_list(
+            'pk', 'username'))
+        paths += [
+            reverse('posts:profile', args=(usernames[user_id],))
+            for user_id in popular
+        ]
+        return paths
+
+    def handle(self, *args, **options):
+        paths = self.get_paths(options['pages'], options['authors'])
+        # Дочерние процессы не должны делить соединение с родителем.
+        db.connections.close_all()
+        started = time.monotonic()
+        timings = []
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [pool.submit(_render, path) for path in paths]
+            for future in as_completed(futures):
+                timings.append(future.result())
+        failed = 0
+        for path, status, seconds in sorted(
+                timings, key=lambda timing: timing[2], reverse=True):
+            if status != 200:
+                failed += 1
+                self.stderr.write(f'{path}: {status}')
+            self.stdout.write(f'{seconds * 1000:8.1f} мс  {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрето страниц: {len(paths) - failed}, ошибок: {failed}, '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
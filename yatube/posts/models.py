@@ -2,10 +2,18 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from core.models import CreatedModel
 
+from .images import empty_image_meta, read_image_meta
+
 
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты без удалённых и без постов отключённых авторов."""
+        return self.filter(is_deleted=False, author__is_active=True)
+
+
 class Post(CreatedModel):
     group = models.ForeignKey(
         'Group',
@@ -21,11 +29,76 @@ class Post(CreatedModel):
         blank=True,
         help_text='Выберете изображение для поста'
     )
+    image_width = models.PositiveIntegerField(
+        'Ширина изображения',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота изображения',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_size = models.PositiveIntegerField(
+        'Размер изображения в байтах',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_hash = models.CharField(
+        'SHA-256 изображения',
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False
+    )
+    image_placeholder = models.TextField(
+        'Заглушка изображения',
+        blank=True,
+        default='',
+        editable=False
+    )
+    is_deleted = models.BooleanField(
+        'Удалён',
+        default=False,
+        help_text='Удалённый пост скрыт и ждёт фоновой очистки'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(CreatedModel.Meta):
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         default_related_name = 'posts'
+        # По возрастанию: индекс читается с конца и сразу даёт порядок
+        # (-pub_date, -id), ведь id лежит в каждой записи индекса.
+        indexes = [
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date_idx'),
+        ]
+
+    def read_image_meta(self):
+        """Заполняет поля image_* по файлу изображения."""
+        meta = None
+        if self.image:
+            meta = read_image_meta(self.image)
+        for field, value in (meta or empty_image_meta()).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'image' in update_fields:
+            # Читаем только что загруженный файл, пока он ещё в памяти.
+            if not self.image or not self.image._committed:
+                self.read_image_meta()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {
+                        *update_fields, *empty_image_meta()}
+        super().save(*args, **kwargs)
 
 
 class Group(models.Model):
@@ -62,6 +135,10 @@ class Comment(CreatedModel):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(fields=['post', 'pub_date'],
+                         name='comment_post_pub_date_idx'),
+        ]
 
 
 class Follow(models.Model):
@@ -77,6 +154,12 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+    pull = models.BooleanField(
+        'Лента по запросу',
+        default=False,
+        help_text='Посты автора не раскладываются в ленту подписчика, '
+                  'а подтягиваются при чтении'
+    )
 
     class Meta:
         verbose_name = 'Подписка'
@@ -91,6 +174,52 @@ class Follow(models.Model):
                 name="check_follow",
             ),
         ]
+        indexes = [
+            models.Index(fields=['author', 'pull', 'user'],
+                         name='follow_author_pull_user_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} подписан на {self.author}'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='feed'
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор поста',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_feed_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'pub_date', 'post'],
+                         name='feed_user_pub_date_post_idx'),
+            models.Index(fields=['user', 'author'],
+                         name='feed_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post} в ленте {self.user}'
@@ -0,0 +1,100 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from core.cache import bump_generation
+from counters.utils import increment_posts
+from tasks.jobs import enqueue
+
+from .models import Comment, FeedEntry, Follow, Post
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def log_progress(label, deleted):
+    logger.info('%s: удалено %s', label, deleted)
+
+
+def delete_in_batches(queryset, batch_size=None, progress=log_progress):
+    """Удаляет строки queryset порциями по PURGE_BATCH_SIZE.
+
+    Каждая порция удаляется своей короткой транзакцией, так что база не
+    блокируется надолго. Возвращает количество удалённых строк.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    model = queryset.model
+    label = model._meta.verbose_name_plural
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        model.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+        progress(label, deleted)
+
+
+def soft_delete_posts(post_ids):
+    """Сразу скрывает посты, а удаляет их фоновая задача.
+
+    Видимые до этого посты вычитаются из счётчиков постов.
+    """
+    post_ids = list(post_ids)
+    with transaction.atomic():
+        hidden = list(Post.objects.visible().filter(
+            pk__in=post_ids).values_list('pk', flat=True))
+        Post.objects.filter(pk__in=post_ids).update(is_deleted=True)
+        increment_posts(Post.objects.filter(pk__in=hidden), -1)
+    bump_generation('posts')
+    enqueue(purge_posts, post_ids, queue='purge')
+
+
+def soft_delete_users(user_ids):
+    """Отключает пользователей, их данные удаляет фоновая задача.
+
+    Посты отключённых вычитаются из счётчиков постов.
+    """
+    for user_id in user_ids:
+        with transaction.atomic():
+            if User.objects.filter(pk=user_id, is_active=True).update(
+                    is_active=False):
+                increment_posts(Post.objects.filter(
+                    author_id=user_id, is_deleted=False), -1)
+        enqueue(purge_user, user_id, queue='purge')
+    bump_generation('posts', 'comments', 'users')
+
+
+def purge_posts(post_ids=None, batch_size=None, progress=log_progress):
+    """Удаляет посты с is_deleted, начиная с их комментариев."""
+    posts = Post.objects.filter(is_deleted=True)
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    for queryset in (Comment.objects.filter(post__in=posts),
+                     FeedEntry.objects.filter(post__in=posts),
+                     posts):
+        delete_in_batches(queryset, batch_size, progress)
+
+
+def purge_user(user_id, batch_size=None, progress=log_progress):
+    """Удаляет отключённого пользователя и всё, что от него зависит."""
+    if User.objects.filter(pk=user_id, is_active=True).exists():
+        logger.info('Пользователь %s снова активен, очистка отменена',
+                    user_id)
+        return
+    posts = Post.objects.filter(author_id=user_id)
+    # Посты отключённого уже вычтены из счётчиков, сигналы удаления
+    # узнают об этом по is_deleted.
+    posts.update(is_deleted=True)
+    for queryset in (
+        Comment.objects.filter(Q(author_id=user_id) | Q(post__in=posts)),
+        FeedEntry.objects.filter(Q(user_id=user_id) | Q(author_id=user_id)),
+        Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id)),
+        posts,
+        User.objects.filter(pk=user_id),
+    ):
+        delete_in_batches(queryset, batch_size, progress)
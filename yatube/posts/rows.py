@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.db.models.query import ValuesListIterable
+
+from core.models import CreatedModel
+
+from .models import Group, Post
+
+User = get_user_model()
+
+
+# Столбцы, которые нужны карточке поста, и только они.
+POST_FIELDS = ('id', 'text', 'text_html', 'pub_date', 'image', 'image_hash',
+               'image_placeholder')
+AUTHOR_FIELDS = ('author_id', 'author__username', 'author__first_name',
+                 'author__last_name')
+GROUP_FIELDS = ('group_id', 'group__slug', 'group__title')
+
+
+class Row:
+    """Строка запроса, равная модели с тем же pk, как и сами модели."""
+
+    __slots__ = ()
+    model = None
+
+    def __eq__(self, other):
+        if isinstance(other, (type(self), self.model)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    @property
+    def pk(self):
+        return self.id
+
+
+class AuthorRow(Row):
+    __slots__ = ('id', 'username', 'first_name', 'last_name')
+    model = User
+
+    def __init__(self, id, username, first_name, last_name):
+        self.id = id
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __str__(self):
+        return self.username
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+
+class GroupRow(Row):
+    __slots__ = ('id', 'slug', 'title')
+    model = Group
+
+    def __init__(self, id, slug, title):
+        self.id = id
+        self.slug = slug
+        self.title = title
+
+    def __str__(self):
+        return self.title
+
+
+class PostRow(Row):
+    """Пост для карточки в ленте: только нужные поля, без модели.
+
+    image хранит имя файла. Аннотации запроса, например поля курсора
+    ленты, доступны как атрибуты.
+    """
+
+    __slots__ = POST_FIELDS + ('author', 'group', 'thumbnail', 'extra')
+    model = Post
+
+    rendered_text = CreatedModel.rendered_text
+
+    def __init__(self, values, author, group, extra):
+        for field, value in zip(POST_FIELDS, values):
+            setattr(self, field, value)
+        self.author = author
+        self.group = group
+        self.thumbnail = None
+        self.extra = extra
+
+    def __getattr__(self, name):
+        try:
+            return object.__getattribute__(self, 'extra')[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f'<PostRow {self.id}>'
+
+
+class PostRowIterable(ValuesListIterable):
+    """Собирает PostRow, один AuthorRow и GroupRow на каждый id."""
+
+    def __iter__(self):
+        authors = {}
+        groups = {}
+        post_end = len(POST_FIELDS)
+        author_end = post_end + len(AUTHOR_FIELDS)
+        group_end = author_end + len(GROUP_FIELDS)
+        extra_names = self.queryset._fields[group_end:]
+        for row in super().__iter__():
+            author_values = row[post_end:author_end]
+            author = authors.get(author_values[0])
+            if author is None:
+                author = authors[author_values[0]] = AuthorRow(*author_values)
+            group_values = row[author_end:group_end]
+            group = None
+            if group_values[0] is not None:
+                group = groups.get(group_values[0])
+                if group is None:
+                    group = groups[group_values[0]] = GroupRow(*group_values)
+            extra = dict(zip(extra_names, row[group_end:]))
+            yield PostRow(row[:post_end], author, group, extra)
+
+
+def post_rows(posts):
+    """QuerySet постов, который отдаёт PostRow вместо моделей.
+
+    Фильтры, сортировка, срезы и count() работают как обычно.
+    """
+    posts = posts.values_list(
+        *POST_FIELDS, *AUTHOR_FIELDS, *GROUP_FIELDS,
+        *posts.query.annotations)
+    posts._iterable_class = PostRowIterable
+    return posts
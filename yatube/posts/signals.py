@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+
+from . import feed, thumbnails
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+USER_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+def post_fan_out(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out_post(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_image_upload(sender, instance, **kwargs):
+    instance._image_uploaded = bool(
+        instance.image and not instance.image._committed)
+
+
+@receiver(post_save, sender=Post)
+def post_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        thumbnails.generate_later(instance.image.name)
+
+
+@receiver(post_save, sender=Follow)
+def follow_backfill(sender, instance, created, **kwargs):
+    if created:
+        feed.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_prune(sender, instance, **kwargs):
+    feed.prune(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, **kwargs):
+    bump_generation('posts')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, **kwargs):
+    bump_generation('comments')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, **kwargs):
+    bump_generation('follows')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    bump_generation('groups')
+
+
+@receiver(pre_save, sender=User)
+def remember_user_names(sender, instance, update_fields=None, **kwargs):
+    instance._old_names = None
+    if not instance.pk:
+        return
+    if update_fields and not set(update_fields) & set(USER_NAME_FIELDS):
+        return
+    instance._old_names = User.objects.filter(pk=instance.pk).values_list(
+        *USER_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, **kwargs):
+    old_names = getattr(instance, '_old_names', None)
+    names = tuple(getattr(instance, field) for field in USER_NAME_FIELDS)
+    if old_names is not None and old_names != names:
+        bump_generation('users')
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.cards import render_cards
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def get_post_cards(posts):
+    return render_cards(posts)
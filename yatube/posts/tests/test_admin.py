@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.admin import PostAdmin
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class AdminChangeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{number}')
+            for number in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(title=f'Группа {number}',
+                                 slug=f'group_{number}',
+                                 description='Описание')
+            for number in range(3)
+        ]
+        cls.posts = [
+            Post.objects.create(author=cls.authors[number % 3],
+                                group=cls.groups[number % 3],
+                                text=f'Пост {number}')
+            for number in range(6)
+        ]
+        for post in cls.posts:
+            Comment.objects.create(post=post, author=cls.authors[0],
+                                   text='Комментарий')
+        Follow.objects.create(user=cls.authors[0], author=cls.authors[1])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_changelist_query_count(self):
+        """Число запросов списка не зависит от числа строк."""
+        for model in ('post', 'comment', 'follow'):
+            url = reverse(f'admin:posts_{model}_changelist')
+            with self.subTest(model=model):
+                # Сессия, пользователь, оценка числа строк и сама страница.
+                with self.assertNumQueries(4):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(ADMIN_COUNT_LIMIT=4)
+    def test_estimated_count(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.context['cl'].result_count,
+                         self.posts[-1].pk)
+        response = self.client.get(reverse('admin:posts_post_changelist'),
+                                   {'pub_date__gte': '2000-01-01 00:00+00:00'})
+        self.assertEqual(response.context['cl'].result_count, 4)
+
+    def test_keyset_pages(self):
+        """Следующая страница выбирается по курсору, без OFFSET."""
+        url = reverse('admin:posts_post_changelist')
+        with mock.patch.object(PostAdmin, 'list_per_page', 4):
+            response = self.client.get(url)
+            pks = [post.pk for post in self.posts[::-1]]
+            self.assertEqual([post.pk for post in
+                              response.context['cl'].result_list], pks[:4])
+            self.assertContains(response, f'?cursor={pks[3]}')
+            response = self.client.get(url, {'cursor': pks[3]})
+        self.assertEqual([post.pk for post in
+                          response.context['cl'].result_list], pks[4:])
+        self.assertContains(response, 'Первая')
+        self.assertNotContains(response, 'Следующая')
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import cards
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Текст тестового поста',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_post(self):
+        return Post.objects.select_related('author', 'group').get(
+            id=self.post.id)
+
+    def test_cards_rendered_once(self):
+        """Карточка рендерится один раз и дальше берётся из кэша."""
+        with mock.patch.object(cards, 'render_to_string',
+                               wraps=cards.render_to_string) as render:
+            first = cards.render_cards([self.get_post()])
+            second = cards.render_cards([self.get_post()])
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn(self.post.text, first[0])
+
+    def test_card_version_changes(self):
+        """Версия карточки меняется при правке поста, группы и автора."""
+        version = cards.card_version(self.get_post())
+        changes = (
+            (Post, self.post.id, 'text', 'Новый текст'),
+            (Group, self.group.id, 'title', 'Новое название'),
+            (User, self.user.id, 'first_name', 'Новое имя'),
+        )
+        for model, pk, field, value in changes:
+            with self.subTest(model=model.__name__):
+                model.objects.filter(pk=pk).update(**{field: value})
+                new_version = cards.card_version(self.get_post())
+                self.assertNotEqual(new_version, version)
+                version = new_version
+
+    def test_listing_uses_cached_cards(self):
+        """Страница группы выводит карточки из кэша."""
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,)))
+        self.assertContains(response, self.post.text)
+        self.assertIsNotNone(cache.get(cards.card_key(self.get_post())))
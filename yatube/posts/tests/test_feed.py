@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.feed import get_feed
+from posts.models import FeedEntry, Follow, Post
+
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.author = User.objects.create_user(username='test_author')
+        cls.other = User.objects.create_user(username='test_other')
+        cls.post = Post.objects.create(author=cls.author,
+                                       text='Текст поста до подписки')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def follow(self):
+        self.authorized_client.get(reverse('posts:profile_follow',
+                                           args=(self.author.username,)))
+
+    def test_follow_backfills_feed(self):
+        """Проверка заполнения ленты при подписке."""
+        self.follow()
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.user, post=self.post).exists())
+
+    def test_new_post_fans_out(self):
+        """Проверка раскладки нового поста по лентам подписчиков."""
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.user, post=post, pub_date=post.pub_date).exists())
+        self.assertFalse(FeedEntry.objects.filter(user=self.other).exists())
+
+    def test_unfollow_prunes_feed(self):
+        """Проверка очистки ленты при отписке."""
+        self.follow()
+        self.authorized_client.get(reverse('posts:profile_unfollow',
+                                           args=(self.author.username,)))
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+
+    def test_follow_index_reads_feed(self):
+        """Проверка страницы подписок."""
+        self.follow()
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_popular_author_is_pulled(self):
+        """Посты популярного автора подтягиваются при чтении."""
+        self.follow()
+        self.assertTrue(Follow.objects.get(user=self.user).pull)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(list(get_feed(self.user)), [post, self.post])
+
+    @override_settings(FEED_BACKFILL_LIMIT=0)
+    def test_prolific_author_is_pulled(self):
+        """Плодовитый автор не копируется в ленту при подписке."""
+        self.follow()
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(list(get_feed(self.user)), [self.post])
+
+    def test_rebuild_feeds(self):
+        """Проверка пересборки лент."""
+        self.follow()
+        FeedEntry.objects.all().delete()
+        Follow.objects.update(pull=True)
+        call_command('rebuild_feeds', stdout=StringIO())
+        self.assertFalse(Follow.objects.get(user=self.user).pull)
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.user, post=self.post).exists())
@@ -6,7 +6,9 @@ from http import HTTPStatus
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Comment, Group, Post
@@ -137,6 +139,23 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(post_count, Post.objects.count())
 
+    def test_group_choices_are_cached(self):
+        """Список групп формы берётся из кэша и сбрасывается с группами."""
+        url = reverse('posts:post_create')
+        self.authorized_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(url)
+        self.assertFalse([query for query in context.captured_queries
+                          if 'posts_group' in query['sql']])
+        self.assertContains(response, self.group.title)
+        group = Group.objects.create(title='Новая группа', slug='new_slug')
+        self.assertContains(self.authorized_client.get(url), group.title)
+        response = self.authorized_client.post(
+            url, data={'text': 'Текст', 'group': group.id + 1})
+        self.assertFormError(response, 'form', 'group',
+                             'Выберите корректный вариант. Вашего варианта '
+                             'нет среди допустимых значений.')
+
     def test_create_comment_anonymous(self):
         """Проверка создания комментария неавторизованным пользователем."""
         comment_count = Comment.objects.count()
@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
 from posts.models import Group, Post
@@ -78,3 +81,26 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     post._meta.get_field(field).help_text,
                     expected_value)
+
+    def test_rendered_text(self):
+        """Проверка готового HTML и отрывка текста."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Первая строка <b>\n\nВторая строка'
+        )
+        self.assertEqual(
+            post.text_html,
+            '<p>Первая строка &lt;b&gt;</p>\n\n<p>Вторая строка</p>'
+        )
+        self.assertEqual(post.excerpt, 'Первая строка <b> Вторая строка')
+        self.assertEqual(post.rendered_text, post.text_html)
+
+    def test_render_texts_command(self):
+        """Проверка заполнения HTML для старых записей."""
+        post, = Post.objects.bulk_create(
+            [Post(author=self.user, text='Текст без HTML')])
+        self.assertEqual(post.rendered_text, '<p>Текст без HTML</p>')
+        call_command('render_texts', stdout=StringIO())
+        post = Post.objects.get(text='Текст без HTML')
+        self.assertEqual(post.text_html, '<p>Текст без HTML</p>')
+        self.assertEqual(post.excerpt, 'Текст без HTML')
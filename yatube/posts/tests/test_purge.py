@@ -0,0 +1,152 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from counters.utils import (GROUP_POSTS, TOTAL_POSTS, USER_POSTS, get_count,
+                            reconcile)
+from posts.models import Comment, FeedEntry, Follow, Group, Post
+from posts.purge import (purge_posts, purge_user, soft_delete_posts,
+                         soft_delete_users)
+from search.index import PostSearchResults
+from tasks.models import Job
+
+
+User = get_user_model()
+
+
+class PurgeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.author = User.objects.create_user(username='test_author')
+        cls.reader = User.objects.create_user(username='test_reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(author=cls.author, text='Текст поста')
+        cls.other = Post.objects.create(author=cls.reader, text='Другой пост')
+        for number in range(5):
+            Comment.objects.create(post=cls.post, author=cls.reader,
+                                   text=f'Комментарий {number}')
+        Comment.objects.create(post=cls.other, author=cls.author,
+                               text='Комментарий автора')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_admin_delete_post_hides_and_enqueues(self):
+        """Удаление в админке скрывает пост и ставит очистку в очередь."""
+        self.client.get(reverse('posts:index'))
+        response = self.client.post(
+            reverse('admin:posts_post_delete', args=(self.post.id,)),
+            {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.objects.get(id=self.post.id).is_deleted)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 5)
+        self.assertEqual(
+            Job.objects.get().task, 'posts.purge.purge_posts')
+        self.assertNotContains(self.client.get(reverse('posts:index')),
+                               self.post.text)
+        self.assertEqual(self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,))
+        ).status_code, 404)
+
+    def test_purge_posts_in_batches(self):
+        Post.objects.filter(id=self.post.id).update(is_deleted=True)
+        progress = []
+        purge_posts(batch_size=2,
+                    progress=lambda label, deleted: progress.append(deleted))
+        self.assertFalse(Post.objects.filter(id=self.post.id).exists())
+        self.assertFalse(Comment.objects.filter(post=self.post).exists())
+        self.assertTrue(Post.objects.filter(id=self.other.id).exists())
+        self.assertEqual(progress, [2, 4, 5, 1, 1])
+
+    def test_admin_delete_user_deactivates(self):
+        """Удалённый в админке пользователь сразу пропадает из лент."""
+        self.client.post(
+            reverse('admin:auth_user_delete', args=(self.author.id,)),
+            {'post': 'yes'})
+        self.assertFalse(User.objects.get(id=self.author.id).is_active)
+        self.assertEqual(Job.objects.get().task, 'posts.purge.purge_user')
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, self.post.text)
+        self.assertContains(response, self.other.text)
+        self.assertEqual(self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        ).status_code, 404)
+
+    def test_purge_user(self):
+        User.objects.filter(id=self.author.id).update(is_active=False)
+        out = StringIO()
+        call_command('purge_deleted', '--users', str(self.author.id),
+                     '--batch-size=2', stdout=out)
+        self.assertIn('Очистка завершена', out.getvalue())
+        self.assertFalse(User.objects.filter(id=self.author.id).exists())
+        self.assertFalse(Comment.objects.filter(author=self.author).exists())
+        self.assertFalse(FeedEntry.objects.filter(
+            author_id=self.author.id).exists())
+        self.assertFalse(Follow.objects.filter(author=self.author).exists())
+        self.assertEqual(Post.objects.get().id, self.other.id)
+
+    def test_purge_skips_active_user(self):
+        purge_user(self.author.id)
+        self.assertTrue(User.objects.filter(id=self.author.id).exists())
+        self.assertTrue(Post.objects.filter(author=self.author).exists())
+
+    def assertPostCounts(self, total, author_posts):
+        self.assertEqual(get_count(TOTAL_POSTS), total)
+        self.assertEqual(get_count(USER_POSTS, self.author.id), author_posts)
+        self.assertEqual(reconcile([TOTAL_POSTS, USER_POSTS, GROUP_POSTS]),
+                         {TOTAL_POSTS: 0, USER_POSTS: 0, GROUP_POSTS: 0})
+
+    def test_soft_delete_posts_updates_counters(self):
+        """Скрытый пост сразу пропадает из счётчиков и из поиска."""
+        group = Group.objects.create(title='Группа', slug='group')
+        post = Post.objects.create(author=self.author, text='Текст в группе',
+                                   group=group)
+        self.assertEqual(PostSearchResults('текст').count(), 2)
+        soft_delete_posts([post.id, self.post.id])
+        self.assertPostCounts(1, 0)
+        self.assertEqual(get_count(GROUP_POSTS, group.id), 0)
+        self.assertEqual(PostSearchResults('текст').count(), 0)
+        soft_delete_posts([post.id])
+        purge_posts()
+        self.assertPostCounts(1, 0)
+
+    def test_soft_delete_users_updates_counters(self):
+        soft_delete_users([self.author.id])
+        self.assertPostCounts(1, 0)
+        author = User.objects.get(id=self.author.id)
+        author.is_active = True
+        author.save()
+        self.assertPostCounts(2, 1)
+        soft_delete_users([self.author.id])
+        purge_user(self.author.id)
+        self.assertPostCounts(1, 0)
+
+    def test_deactivation_through_save_hides_posts(self):
+        """Флажок активности в форме пользователя сразу меняет ленты."""
+        self.client.logout()
+        url = reverse('posts:index')
+        self.assertContains(self.client.get(url), self.post.text)
+        author = User.objects.get(id=self.author.id)
+        author.is_active = False
+        author.save()
+        self.assertNotContains(self.client.get(url), self.post.text)
+        author.is_active = True
+        author.save()
+        self.assertContains(self.client.get(url), self.post.text)
+
+    def test_hidden_post_is_closed(self):
+        """Скрытый пост нельзя править и комментировать."""
+        soft_delete_posts([self.post.id])
+        self.client.force_login(self.author)
+        for name in ('posts:post_edit', 'posts:add_comment',
+                     'posts:post_comments'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=(self.post.id,)))
+                self.assertEqual(response.status_code, 404)
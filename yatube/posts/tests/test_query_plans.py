@@ -0,0 +1,86 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+# Полный проход по таблице: SCAN без индекса. Проход по результату
+# подзапроса таблицу не читает, планы его частей проверяются отдельно.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?!subquery$)\w+( AS \w+)?$')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class QueryPlanTests(TestCase):
+    """Запросы страниц-лент не читают таблицы целиком и не сортируют."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Текст тестового поста',
+            group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.user,
+                               text='Текст комментария')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def assertIndexedPlans(self, url, data=None, allow_sort=False):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url, data).status_code, 200)
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            for step in explain(query['sql']):
+                with self.subTest(url=url, sql=query['sql'], step=step):
+                    if not allow_sort:
+                        self.assertNotIn('USE TEMP B-TREE', step)
+                    self.assertNotRegex(step, FULL_SCAN)
+
+    def test_listing_query_plans(self):
+        """Ленты используют составные индексы."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            self.assertIndexedPlans(url)
+            self.assertIndexedPlans(url, {'cursor': ''})
+
+    def test_pull_feed_query_plan(self):
+        """Лента с авторами по запросу читает таблицы по индексам.
+
+        Посты из ленты и посты авторов по запросу сливаются сортировкой:
+        это плата за то, что их не раскладывают по лентам при записи.
+        """
+        Follow.objects.update(pull=True)
+        self.assertIndexedPlans(reverse('posts:follow_index'),
+                                allow_sort=True)
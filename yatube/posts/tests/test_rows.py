@@ -0,0 +1,65 @@
+import pickle
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.feed import get_feed
+from posts.models import Follow, Group, Post
+from posts.rows import PostRow, post_rows
+
+
+User = get_user_model()
+
+
+class PostRowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='test_author', first_name='Имя', last_name='Фамилия')
+        cls.reader = User.objects.create_user(username='test_reader')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}',
+                                group=cls.group if number else None)
+            for number in range(3)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_rows_select_only_card_columns(self):
+        """Строки не тянут пароль и остальные столбцы пользователя."""
+        with CaptureQueriesContext(connection) as context:
+            rows = list(post_rows(Post.objects.all()))
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('password', sql)
+        self.assertNotIn('last_login', sql)
+        self.assertEqual(rows, self.posts[::-1])
+        first, last = rows[0], rows[-1]
+        self.assertIsInstance(first, PostRow)
+        self.assertEqual(first.author, self.author)
+        self.assertIs(first.author, last.author)
+        self.assertEqual(first.author.get_full_name(), 'Имя Фамилия')
+        self.assertEqual(str(first.author), 'test_author')
+        self.assertEqual(first.group, self.group)
+        self.assertIsNone(last.group)
+        self.assertEqual(first.rendered_text, '<p>Пост 2</p>')
+
+    def test_feed_rows_keep_cursor_fields(self):
+        row = post_rows(get_feed(self.reader))[0]
+        self.assertEqual(row.feed_post_id, self.posts[-1].id)
+        with self.assertRaises(AttributeError):
+            row.missing
+
+    def test_rows_survive_pickle(self):
+        """Страницы строк кладутся в кэш."""
+        row = post_rows(Post.objects.all())[0]
+        restored = pickle.loads(pickle.dumps(row))
+        self.assertEqual(restored, row)
+        self.assertEqual(restored.author.username, 'test_author')
+        self.assertEqual(restored.text, row.text)
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from sorl.thumbnail import default
+
+from posts import thumbnails
+from posts.models import Post
+from tasks import jobs
+from tasks.models import Job
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+class ThumbnailMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_author')
+        self.image = SimpleUploadedFile(
+            name='test_image.gif',
+            content=(
+                b'\x47\x49\x46\x38\x39\x61\x02\x00'
+                b'\x01\x00\x80\x00\x00\x00\x00\x00'
+                b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+                b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+                b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+                b'\x0A\x00\x3B'
+            ),
+            content_type='image/gif'
+        )
+
+    def assertThumbnailsExist(self, image_name):
+        for geometry, options in thumbnails.GEOMETRIES:
+            with self.subTest(geometry=geometry):
+                thumbnail = default.backend.get_thumbnail(
+                    image_name, geometry, **options)
+                self.assertTrue(thumbnail.exists())
+                self.assertIsNotNone(default.kvstore.get(thumbnail))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(ThumbnailMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_upload_schedules_generation(self):
+        """Создание миниатюр ставится в очередь после загрузки."""
+        post = Post.objects.create(author=self.user, text='Текст',
+                                   image=self.image)
+        Post.objects.get(id=post.id).save()
+        job = Job.objects.get()
+        self.assertEqual(job.queue, 'images')
+        self.assertEqual(job.task, 'posts.thumbnails.generate_thumbnails')
+        self.assertEqual(json.loads(job.args), [post.image.name])
+        self.assertEqual(jobs.claim('images', 1), [job.id])
+        self.assertTrue(jobs.execute(job.id))
+        self.assertThumbnailsExist(post.image.name)
+
+    def test_resolve_thumbnails(self):
+        """Миниатюры страницы находятся одним get_many и одним запросом."""
+        posts = [
+            Post.objects.create(author=self.user, text=f'Текст {number}',
+                                image=self.image)
+            for number in range(3)
+        ]
+        for post in posts:
+            thumbnails.generate_thumbnails(post.image.name)
+        cache.clear()
+        with self.assertNumQueries(1):
+            thumbnails.resolve_thumbnails(posts)
+        for post in Post.objects.all():
+            with self.subTest(post=post.id):
+                self.assertFalse(hasattr(post, 'thumbnail'))
+        with self.assertNumQueries(0):
+            thumbnails.resolve_thumbnails(posts)
+        geometry, options = thumbnails.CARD_GEOMETRY
+        expected = default.backend.get_thumbnail(
+            posts[0].image.name, geometry, **options)
+        self.assertEqual(posts[0].thumbnail.url, expected.url)
+        self.assertEqual(posts[0].thumbnail.size, expected.size)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageMetaTests(ThumbnailMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_upload_stores_image_meta(self):
+        """Размеры, вес, хэш и заглушка читаются один раз при загрузке."""
+        content = self.image.read()
+        post = Post.objects.create(author=self.user, text='Текст',
+                                   image=self.image)
+        post = Post.objects.get(id=post.id)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertEqual(post.image_size, len(content))
+        self.assertEqual(post.image_hash, hashlib.sha256(content).hexdigest())
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,'))
+        with mock.patch('posts.models.read_image_meta') as read:
+            post.text = 'Новый текст'
+            post.save()
+        read.assert_not_called()
+        post.image = None
+        post.save()
+        post.refresh_from_db()
+        self.assertIsNone(post.image_width)
+        self.assertEqual(post.image_placeholder, '')
+
+    def test_fill_image_meta_command(self):
+        """Команда заполняет поля изображений у старых постов."""
+        post = Post.objects.create(author=self.user, text='Текст',
+                                   image=self.image)
+        expected = Post.objects.values_list(
+            'image_width', 'image_height', 'image_hash').get(id=post.id)
+        Post.objects.update(image_width=None, image_height=None,
+                            image_hash='')
+        Post.objects.create(author=self.user, text='Без файла',
+                            image='posts/missing.gif')
+        out = StringIO()
+        err = StringIO()
+        call_command('fill_image_meta', stdout=out, stderr=err)
+        self.assertIn('Изображений обработано: 2, ошибок: 1',
+                      out.getvalue())
+        self.assertIn('posts/missing.gif', err.getvalue())
+        self.assertEqual(
+            Post.objects.values_list(
+                'image_width', 'image_height', 'image_hash').get(id=post.id),
+            expected
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class RegenerateThumbnailsTests(ThumbnailMixin, TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_regenerate_thumbnails_command(self):
+        """Проверка пересоздания всех миниатюр."""
+        post = Post.objects.create(author=self.user, text='Текст',
+                                   image=self.image)
+        out = StringIO()
+        with mock.patch(
+            'posts.management.commands.regenerate_thumbnails.'
+            'ProcessPoolExecutor', ThreadPoolExecutor
+        ):
+            call_command('regenerate_thumbnails', '--workers=2', stdout=out)
+        self.assertIn('Обработано изображений: 1, ошибок: 0', out.getvalue())
+        self.assertThumbnailsExist(post.image.name)
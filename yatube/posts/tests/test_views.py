@@ -11,6 +11,7 @@ from django.urls import reverse
 
 from posts.forms import PostForm
 from posts.models import Comment, Group, Post
+from posts.utils import PostPaginator
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -83,9 +84,10 @@ class PostViewsTests(TestCase):
             (post.author, self.user),
             (post.pub_date, self.post.pub_date),
             (post.group, self.post.group),
-            (post.comments, self.post.comments),
             (post.image, self.post.image)
         )
+        if check:
+            self.fields += ((post.comments, self.post.comments),)
         for field, correct_field in self.fields:
             with self.subTest(field=field):
                 self.assertEqual(field, correct_field)
@@ -170,6 +172,29 @@ class PostViewsTests(TestCase):
         )
         self.assertContains(response, self.comments.text)
 
+    @override_settings(COMMENTS_LIMIT=2)
+    def test_comments_load_in_chunks(self):
+        """Комментарии выводятся порциями, остальные подгружаются."""
+        for number in range(3):
+            Comment.objects.create(post=self.post, author=self.new_user,
+                                   text=f'Комментарий {number}')
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,)))
+        comments = response.context['comments']
+        self.assertEqual([comment.text for comment in comments],
+                         ['Комментарий 2', 'Комментарий 1'])
+        self.assertEqual(response.context['comments_count'], 4)
+        self.assertContains(response, 'Комментариев: 4')
+        url = (reverse('posts:post_comments', args=(self.post.id,))
+               + f'?cursor={comments.next_cursor}')
+        self.assertContains(response, url.replace('&', '&amp;'))
+        response = self.client.get(url)
+        self.assertEqual([comment.text for comment in
+                          response.context['comments']],
+                         ['Комментарий 0', self.comments.text])
+        self.assertNotContains(response, 'data-more-comments')
+        self.assertNotContains(response, '<html')
+
     def test_index_cache(self):
         """Проверка cache-а на главной странице."""
         post = Post.objects.create(
@@ -178,7 +203,8 @@ class PostViewsTests(TestCase):
             group=self.group
         )
         response = self.authorized_client.get(reverse('posts:index'))
-        post.delete()
+        Post.objects.filter(id=post.id).update(
+            text='Без сигналов', text_html='<p>Без сигналов</p>')
         response_cache = self.authorized_client.get(reverse('posts:index'))
         cache.clear()
         response_cache_clear = self.authorized_client.get(
@@ -187,6 +213,60 @@ class PostViewsTests(TestCase):
         self.assertNotEqual(response_cache.content,
                             response_cache_clear.content)
 
+    def test_index_cache_invalidation(self):
+        """Кэш главной сбрасывается при изменении постов, групп и авторов."""
+        def create_post():
+            Post.objects.create(text='Новый пост для кэша', author=self.user)
+            return 'Новый пост для кэша'
+
+        def rename_group():
+            group = Group.objects.get(id=self.group.id)
+            group.title = 'Новое название группы'
+            group.save()
+            return group.title
+
+        def rename_author():
+            author = User.objects.get(id=self.user.id)
+            author.first_name = 'Новое'
+            author.last_name = 'Имя'
+            author.save()
+            return author.get_full_name()
+
+        for change in (create_post, rename_group, rename_author):
+            with self.subTest(change=change.__name__):
+                self.client.get(reverse('posts:index'))
+                expected = change()
+                response = self.client.get(reverse('posts:index'))
+                self.assertContains(response, expected)
+
+    def test_group_cache_after_rename(self):
+        """Карточки на странице группы показывают её новое название."""
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        self.client.get(url)
+        group = Group.objects.get(id=self.group.id)
+        group.title = 'Новое название группы'
+        group.save()
+        response = self.client.get(url)
+        self.assertContains(response, group.title, count=3)
+        self.assertNotContains(response, self.group.title)
+
+    def test_index_cache_does_not_leak_switcher(self):
+        """Кэш главной не отдаёт переключатель лент анонимам и наоборот."""
+        switcher = reverse('posts:follow_index')
+        self.assertNotContains(self.client.get(reverse('posts:index')),
+                               switcher)
+        self.assertContains(
+            self.authorized_client.get(reverse('posts:index')), switcher)
+        self.assertNotContains(self.client.get(reverse('posts:index')),
+                               switcher)
+
+    def test_follow_page_cache_per_user(self):
+        """Лента подписок кэшируется для каждого пользователя отдельно."""
+        response = self.authorized_client_3.get(reverse('posts:follow_index'))
+        self.assertContains(response, self.post.text)
+        response = self.authorized_client_2.get(reverse('posts:follow_index'))
+        self.assertNotContains(response, self.post.text)
+
     def test_follow_page(self):
         following_count = self.user.following.count()
         self.authorized_client_2.get(reverse('posts:profile_follow',
@@ -212,6 +292,48 @@ class PostViewsTests(TestCase):
         response = self.authorized_client_2.get(reverse('posts:follow_index'))
         self.assertEqual(len(response.context.get('page_obj')), 1)
 
+    def test_conditional_get(self):
+        """Повторный запрос с тем же ETag получает 304 без запросов к базе."""
+        urls = (
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get_after_changes(self):
+        """ETag меняется вместе с постами, комментариями и подписками."""
+        def add_comment():
+            Comment.objects.create(post=self.post, author=self.new_user,
+                                   text='Новый комментарий')
+
+        def edit_post():
+            post = Post.objects.get(id=self.post.id)
+            post.text = 'Новый текст'
+            post.save()
+
+        def follow():
+            self.authorized_client_2.get(
+                reverse('posts:profile_follow', args=(self.user.username,)))
+
+        detail_url = reverse('posts:post_detail', args=(self.post.id,))
+        profile_url = reverse('posts:profile', args=(self.user.username,))
+        for change, url in ((add_comment, detail_url),
+                            (edit_post, detail_url), (follow, profile_url)):
+            with self.subTest(change=change.__name__):
+                etag = self.client.get(url)['ETag']
+                change()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PaginatorViewsTest(TestCase):
@@ -266,3 +388,38 @@ class PaginatorViewsTest(TestCase):
                             reverse(name, args=args) + page)
                         self.assertEqual(len(response.context['page_obj']),
                                          amount)
+
+    def test_page_window(self):
+        """Ссылки пагинатора берутся из окна вокруг текущей страницы."""
+        paginator = PostPaginator(range(1000), 10)
+        for number, window in ((1, range(1, 4)), (50, range(48, 53)),
+                               (100, range(98, 101))):
+            with self.subTest(number=number):
+                self.assertEqual(paginator.get_page(number).page_window,
+                                 window)
+        response = self.client.get(reverse('posts:index') + '?page=2')
+        self.assertContains(response, '?page=1">1</a>', count=2)
+        self.assertNotContains(response, '?page=3')
+
+    def test_cursor_paginator(self):
+        """Проверка постраничного вывода по курсору."""
+        response = self.client.get(reverse('posts:index') + '?cursor=')
+        first_page = response.context['page_obj']
+        self.assertEqual(len(first_page), settings.LIMIT)
+        self.assertFalse(first_page.has_previous())
+        response = self.client.get(
+            reverse('posts:index') + f'?cursor={first_page.next_cursor}')
+        second_page = response.context['page_obj']
+        self.assertEqual(len(second_page), settings.TEST_PAGES)
+        self.assertFalse(second_page.has_next())
+        self.assertFalse(set(first_page) & set(second_page))
+        response = self.client.get(
+            reverse('posts:index')
+            + f'?cursor={second_page.previous_cursor}')
+        self.assertEqual(list(response.context['page_obj']),
+                         list(first_page))
+
+    def test_cursor_paginator_broken_cursor(self):
+        """Битый курсор открывает первую страницу."""
+        response = self.client.get(reverse('posts:index') + '?cursor=broken')
+        self.assertEqual(len(response.context['page_obj']), settings.LIMIT)
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from posts.models import Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class WarmCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_author')
+        self.reader = User.objects.create_user(username='test_reader')
+        self.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test_slug',
+            description='Описание тестовой группы',
+        )
+        Post.objects.create(author=self.author, text='Текст',
+                            group=self.group)
+        Follow.objects.create(user=self.reader, author=self.author)
+        # У отключённого автора больше подписчиков, но его профиль закрыт.
+        self.banned = User.objects.create_user(username='test_banned')
+        Follow.objects.create(user=self.reader, author=self.banned)
+        Follow.objects.create(user=self.author, author=self.banned)
+        User.objects.filter(id=self.banned.id).update(is_active=False)
+
+    def test_warm_cache_command(self):
+        """Команда открывает главную, группы и профили популярных авторов."""
+        out = StringIO()
+        with mock.patch(
+            'posts.management.commands.warm_cache.ProcessPoolExecutor',
+            ThreadPoolExecutor
+        ):
+            call_command('warm_cache', '--pages=2', '--authors=1',
+                         '--workers=1', stdout=out)
+        output = out.getvalue()
+        for path in ('/\n', '/?page=2', '/group/test_slug/',
+                     '/profile/test_author/'):
+            with self.subTest(path=path):
+                self.assertIn(f'мс  {path}', output)
+        self.assertNotIn('/profile/test_reader/', output)
+        self.assertNotIn('/profile/test_banned/', output)
+        self.assertIn('Прогрето страниц: 4, ошибок: 0', output)
+        for path in ('/', '/?page=2', '/group/test_slug/',
+                     '/profile/test_author/'):
+            with self.subTest(path=path), self.assertNumQueries(0):
+                self.client.get(path)
@@ -0,0 +1,91 @@
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    EMPTY_VALUE, KVStore as CachedDBKVStore)
+from sorl.thumbnail.models import KVStore
+
+from tasks.jobs import enqueue
+
+
+# Все геометрии, в которых шаблоны выводят Post.image.
+CARD_GEOMETRY = ('960x339', {'crop': 'center', 'upscale': True})
+GEOMETRIES = (
+    CARD_GEOMETRY,
+)
+
+
+def generate_thumbnails(image_name):
+    """Создаёт миниатюры изображения во всех геометриях шаблонов."""
+    return [
+        get_thumbnail(image_name, geometry, **options)
+        for geometry, options in GEOMETRIES
+    ]
+
+
+def generate_later(image_name):
+    """Ставит создание миниатюр в очередь исполнителя задач."""
+    enqueue(generate_thumbnails, image_name, queue='images')
+
+
+def _thumbnail_file(image, geometry, options):
+    """Имя миниатюры так же, как его считает ThumbnailBackend."""
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return ImageFile(name, default.storage)
+
+
+def _attach(post, thumbnail):
+    # Без размера миниатюра не создалась: исходного файла нет.
+    if thumbnail.size:
+        post.thumbnail = thumbnail
+
+
+def resolve_thumbnails(posts, geometry=CARD_GEOMETRY):
+    """Проставляет post.thumbnail всем постам страницы.
+
+    Миниатюры ищутся одним get_many в кэше sorl и одним запросом к его
+    таблице; создаются на месте только те, которых нет нигде.
+    """
+    geometry_string, options = geometry
+    posts = [post for post in posts if post.image]
+    if not isinstance(default.kvstore, CachedDBKVStore):
+        for post in posts:
+            _attach(post, get_thumbnail(post.image, geometry_string,
+                                        **options))
+        return
+    keys = {
+        post.pk: add_prefix(
+            _thumbnail_file(post.image, geometry_string, options).key)
+        for post in posts
+    }
+    kv_cache = default.kvstore.cache
+    values = {
+        key: value for key, value in kv_cache.get_many(keys.values()).items()
+        if value != EMPTY_VALUE
+    }
+    missing = set(keys.values()) - set(values)
+    if missing:
+        found = dict(KVStore.objects.filter(key__in=missing).values_list(
+            'key', 'value'))
+        kv_cache.set_many(found, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(found)
+    for post in posts:
+        value = values.get(keys[post.pk])
+        if value is None:
+            _attach(post, get_thumbnail(post.image, geometry_string,
+                                        **options))
+        else:
+            _attach(post, deserialize_image_file(value))
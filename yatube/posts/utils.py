@@ -1,8 +1,181 @@
+import base64
+import binascii
+from collections.abc import Sequence
+from datetime import datetime
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+
+from core.cache import fetch, make_fragment_key, make_stale_key
+
+from .models import Comment
+
+
+# Поля ключа постраничного вывода по курсору: дата и уникальный id.
+KEYSET = ('pub_date', 'pk')
 
 
-def get_page_obj(request, posts):
-    paginator = Paginator(posts, settings.LIMIT)
+def get_page_obj(request, posts, count=None, keyset=KEYSET):
+    if 'cursor' in request.GET or settings.CURSOR_PAGINATION:
+        paginator = CursorPaginator(posts, settings.LIMIT, keyset)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = PostPaginator(posts, settings.LIMIT, count=count)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def get_cached_page_obj(request, name, generations, posts, count=None):
+    """Как get_page_obj, но посты страницы берутся из кэша.
+
+    Список живёт до смены поколений generations, а пересчитывает его
+    один запрос, пока остальные получают прежний.
+    """
+    page_obj = get_page_obj(request, posts, count)
+    if getattr(page_obj, 'is_cursor', False):
+        return page_obj
+    vary_on = [page_obj.number]
+    page_obj.object_list, _ = fetch(
+        make_fragment_key(name, generations, vary_on),
+        lambda: list(page_obj.object_list),
+        stale_key=make_stale_key(name, vary_on),
+    )
+    return page_obj
+
+
+def get_comments_page(post_id, cursor=None):
+    """Порция комментариев к посту, от новых к старым."""
+    comments = Comment.objects.filter(
+        post_id=post_id, author__is_active=True
+    ).select_related('author').only(
+        'text', 'text_html', 'pub_date', 'author', 'author__username')
+    paginator = CursorPaginator(comments, settings.COMMENTS_LIMIT)
+    return paginator.get_page(cursor)
+
+
+class PostPaginator(Paginator):
+    """Paginator, которому можно передать заранее известное число постов.
+
+    У страниц есть page_window: номера не дальше PAGINATOR_WINDOW от
+    текущего, чтобы шаблон не перебирал все страницы.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    def page(self, number):
+        page = super().page(number)
+        window = settings.PAGINATOR_WINDOW
+        page.page_window = range(max(page.number - window, 1),
+                                 min(page.number + window,
+                                     self.num_pages) + 1)
+        return page
+
+
+def encode_cursor(direction, obj, keyset=KEYSET):
+    date_field, pk_field = keyset
+    raw = (f'{direction}{getattr(obj, date_field).isoformat()}'
+           f'|{getattr(obj, pk_field)}')
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (направление, дата, pk) или None для битого курсора."""
+    try:
+        raw = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, raw = raw[0], raw[1:]
+        pub_date, pk = raw.rsplit('|', 1)
+        if direction not in 'np':
+            return None
+        return direction, datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, IndexError):
+        return None
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу (pub_date, id) без COUNT и OFFSET."""
+
+    def __init__(self, object_list, per_page, keyset=KEYSET):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.keyset = keyset
+
+    def _seek(self, lookup, pub_date, pk):
+        date_field, pk_field = self.keyset
+        return (Q(**{f'{date_field}__{lookup}': pub_date})
+                | Q(**{date_field: pub_date, f'{pk_field}__{lookup}': pk}))
+
+    def get_page(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self._forward(None, cursor=None)
+        direction, pub_date, pk = decoded
+        if direction == 'p':
+            return self._backward(pub_date, pk, cursor)
+        return self._forward(self._seek('lt', pub_date, pk), cursor)
+
+    def _forward(self, seek, cursor):
+        date_field, pk_field = self.keyset
+        posts = self.object_list.order_by(f'-{date_field}', f'-{pk_field}')
+        if seek is not None:
+            posts = posts.filter(seek)
+        items = list(posts[:self.per_page + 1])
+        has_next = len(items) > self.per_page
+        return CursorPage(items[:self.per_page], self, cursor,
+                          has_next=has_next, has_previous=seek is not None)
+
+    def _backward(self, pub_date, pk, cursor):
+        posts = self.object_list.order_by(*self.keyset).filter(
+            self._seek('gt', pub_date, pk))
+        items = list(posts[:self.per_page + 1])
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return CursorPage(items, self, cursor,
+                          has_next=True, has_previous=has_previous)
+
+
+class CursorPage(Sequence):
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, cursor, has_next,
+                 has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = cursor or 1
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Page {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor('n', self.object_list[-1],
+                                 self.paginator.keyset)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor('p', self.object_list[0],
+                                 self.paginator.keyset)
+        return None
@@ -1,62 +1,119 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, render, redirect
-
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
+
+from core.cache import make_etag
+from counters.post_views import get_views, record_view, viewer_id
+from counters.utils import (GROUP_POSTS, POST_COMMENTS, TOTAL_POSTS,
+                            USER_FOLLOWERS, USER_FOLLOWING, USER_POSTS,
+                            get_count)
+from .feed import FEED_KEYSET, get_feed
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post
-from .utils import get_page_obj
+from .rows import post_rows
+from .thumbnails import resolve_thumbnails
+from .utils import get_cached_page_obj, get_comments_page, get_page_obj
 
 User = get_user_model()
 
 
+def etag_from(*generations):
+    """ETag страницы, собранной из данных этих поколений."""
+    def etag_func(request, *args, **kwargs):
+        return make_etag(request, generations)
+    return etag_func
+
+
 def index(request):
-    posts = Post.objects.select_related('author', 'group').all()
+    posts = post_rows(Post.objects.visible())
     context = {
-        'page_obj': get_page_obj(request, posts),
+        'page_obj': get_cached_page_obj(
+            request, 'index_posts', ('posts', 'groups', 'users'), posts,
+            get_count(TOTAL_POSTS)),
     }
     return render(request, 'posts/index.html', context)
 
 
+@condition(etag_func=etag_from('posts', 'groups', 'users'))
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author').all()
+    posts = post_rows(group.posts.visible())
     context = {
         'group': group,
-        'page_obj': get_page_obj(request, posts),
+        'page_obj': get_cached_page_obj(
+            request, f'group_posts:{group.id}', ('posts', 'groups', 'users'),
+            posts,
+            get_count(GROUP_POSTS, group.id)),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@condition(etag_func=etag_from('posts', 'groups', 'users', 'follows'))
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group').all()
-    posts_count = posts.count()
+    author = get_object_or_404(User, username=username, is_active=True)
+    posts = post_rows(author.posts.visible())
+    posts_count = get_count(USER_POSTS, author.id)
     following = author.following.filter(
         user=request.user.id).exists()
     context = {
         'author': author,
         'posts_count': posts_count,
-        'page_obj': get_page_obj(request, posts),
+        'following_count': get_count(USER_FOLLOWING, author.id),
+        'followers_count': get_count(USER_FOLLOWERS, author.id),
+        'page_obj': get_page_obj(request, posts, posts_count),
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@condition(etag_func=etag_from('posts', 'groups', 'users', 'comments'))
 def post_detail(request, post_id):
     form = CommentForm()
     post = get_object_or_404(
-        Post.objects.prefetch_related('comments__author'),
-        id=post_id
-    )
+        Post.objects.visible().select_related('author', 'group'), id=post_id)
+    resolve_thumbnails([post])
     context = {
         'form': form,
         'post': post,
+        'post_id': post.id,
         'author': post.author,
-        'comments': post.comments.all()
+        'author_posts_count': get_count(USER_POSTS, post.author_id),
+        'comments_count': get_count(POST_COMMENTS, post.id),
+        'comments': get_comments_page(post.id),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@csrf_exempt
+@require_POST
+def post_view(request, post_id):
+    """Засчитывает просмотр и отдаёт счётчики на момент последнего сброса.
+
+    Страница поста может прийти из кэша или как 304, поэтому счётчики
+    в неё не рендерятся, а подставляются по этому ответу.
+    """
+    stats = get_views(post_id)
+    if stats is None:
+        raise Http404
+    record_view(post_id, viewer_id(request))
+    views, unique_views = stats
+    return JsonResponse({'views': views, 'unique_views': unique_views})
+
+
+@condition(etag_func=etag_from('posts', 'users', 'comments'))
+def post_comments(request, post_id):
+    """Следующая порция комментариев для подгрузки на странице поста."""
+    post = get_object_or_404(Post.objects.visible().only('id'), id=post_id)
+    context = {
+        'post_id': post.id,
+        'comments': get_comments_page(post.id, request.GET.get('cursor')),
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -70,7 +127,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.visible(), id=post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
     form = PostForm(request.POST or None,
@@ -85,7 +142,7 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.visible(), id=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comments = form.save(commit=False)
@@ -97,10 +154,9 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user
-                                ).select_related('author', 'group').all()
+    posts = post_rows(get_feed(request.user))
     context = {
-        'page_obj': get_page_obj(request, posts),
+        'page_obj': get_page_obj(request, posts, keyset=FEED_KEYSET),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -0,0 +1,16 @@
+from django.db.models.expressions import RawSQL
+
+from . import index
+
+
+class FullTextSearchMixin:
+    """Поиск в админке по полнотекстовому индексу вместо LIKE '%q%'."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not index.is_available():
+            return super().get_search_results(request, queryset, search_term)
+        match = index.to_match(search_term)
+        if not match:
+            return queryset.none(), False
+        return queryset.filter(pk__in=RawSQL(
+            index.matching_ids_sql(queryset.model), [match])), False
@@ -0,0 +1,128 @@
+from django.db import connection
+
+from posts.models import Comment, Post
+
+from .stemmer import tokenize
+
+
+# Таблица FTS5 для каждой индексируемой модели: rowid совпадает с pk.
+TABLES = {
+    Post: 'search_post',
+    Comment: 'search_comment',
+}
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def to_match(query):
+    """Запрос пользователя в выражение MATCH или пустая строка.
+
+    Все слова обязательны, каждое ищется по основе как префикс.
+    """
+    return ' '.join(f'"{term}"*' for term in tokenize(query))
+
+
+def index_object(obj):
+    table = TABLES[type(obj)]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [obj.pk])
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, text) VALUES (%s, %s)',
+            [obj.pk, ' '.join(tokenize(obj.text))]
+        )
+
+
+def remove_object(obj):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLES[type(obj)]} WHERE rowid = %s',
+                       [obj.pk])
+
+
+def rebuild(model, batch_size=500):
+    """Пересобирает индекс модели целиком. Возвращает число записей."""
+    table = TABLES[model]
+    total = 0
+    last_id = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        while True:
+            batch = list(
+                model.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'text')[:batch_size]
+            )
+            if not batch:
+                break
+            cursor.executemany(
+                f'INSERT INTO {table} (rowid, text) VALUES (%s, %s)',
+                [(pk, ' '.join(tokenize(text))) for pk, text in batch]
+            )
+            total += len(batch)
+            last_id = batch[-1][0]
+    return total
+
+
+def matching_ids_sql(model):
+    """Подзапрос pk записей модели, подходящих под MATCH из параметра."""
+    table = TABLES[model]
+    return f'SELECT rowid FROM {table} WHERE {table} MATCH %s'
+
+
+# Видимые посты, найденные по своему тексту или по тексту комментариев,
+# с лучшим рангом bm25 из всех совпадений.
+POSTS_SQL = '''
+    SELECT post_id, MIN(score) AS score FROM (
+        SELECT rowid AS post_id, rank AS score
+        FROM search_post WHERE search_post MATCH %s
+        UNION ALL
+        SELECT comment.post_id, search_comment.rank
+        FROM search_comment
+        JOIN posts_comment AS comment ON comment.id = search_comment.rowid
+        WHERE search_comment MATCH %s
+    ) AS found
+    JOIN posts_post AS post ON post.id = found.post_id
+    JOIN auth_user AS author ON author.id = post.author_id
+    WHERE NOT post.is_deleted AND author.is_active
+    GROUP BY post_id
+'''
+
+
+class PostSearchResults:
+    """Посты по запросу: count() и срезы для Paginator.
+
+    Срез выбирает из индекса только нужную страницу id по рангу,
+    а посты для неё достаёт одним запросом.
+    """
+
+    def __init__(self, query, queryset=None):
+        self.match = to_match(query)
+        if queryset is None:
+            queryset = Post.objects.all()
+        self.queryset = queryset
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM ({POSTS_SQL})',
+                           [self.match, self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError('Поддерживаются только срезы без шага')
+        if not self.match:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{POSTS_SQL} ORDER BY score, post_id DESC LIMIT %s OFFSET %s',
+                [self.match, self.match, index.stop - start, start]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов и комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько записей индексировать одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        if not index.is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite')
+        for model in index.TABLES:
+            total = index.rebuild(model, options['batch_size'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: проиндексировано {total}')
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+TABLES = ('search_post', 'search_comment')
+
+
+def create_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5("
+            f"text, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('posts', '0011_image_meta'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tables, drop_tables),
+    ]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Post
+
+from . import index
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_index(sender, instance, update_fields=None, **kwargs):
+    if not index.is_available():
+        return
+    if update_fields is None or 'text' in update_fields:
+        index.index_object(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_from_index(sender, instance, **kwargs):
+    if index.is_available():
+        index.remove_object(instance)
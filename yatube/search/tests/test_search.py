@@ -0,0 +1,101 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from search import index
+from search.stemmer import stem, tokenize
+
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+    def test_stem(self):
+        """Разные формы слова сводятся к одной основе."""
+        for words in (
+            ('кошка', 'кошки', 'кошкам', 'кошкой'),
+            ('зелёный', 'зеленые', 'зелёными'),
+            ('бегали', 'бегать'),
+        ):
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Django, КОШКИ!'), ['django', 'кошк'])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Рыжие кошки гуляли по крыше')
+        cls.other = Post.objects.create(
+            author=cls.user, text='Про собак')
+
+    def setUp(self):
+        self.client = Client()
+
+    def search(self, query):
+        return list(index.PostSearchResults(query)[:settings.LIMIT])
+
+    def test_index_is_incremental(self):
+        """Индекс обновляется при сохранении и удалении."""
+        self.assertEqual(self.search('кошкой'), [self.post])
+        self.assertEqual(self.search('кош'), [self.post])
+        self.assertEqual(self.search('рыжая кошка'), [self.post])
+        self.assertEqual(self.search('рыжая собака'), [])
+        self.post.text = 'Теперь про котов'
+        self.post.save()
+        self.assertEqual(self.search('кошки'), [])
+        self.assertEqual(self.search('коты'), [self.post])
+        comment = Comment.objects.create(
+            post=self.other, author=self.user, text='Собаки лучше кошек')
+        self.assertEqual(self.search('кошек'), [self.other])
+        comment.delete()
+        self.assertEqual(self.search('кошек'), [])
+        self.other.delete()
+        self.assertEqual(self.search('собаки'), [])
+
+    def test_ranking(self):
+        """Пост с частым совпадением выше поста с редким."""
+        best = Post.objects.create(
+            author=self.user, text='Кошки, кошки и ещё раз кошки')
+        self.assertEqual(self.search('кошки'), [best, self.post])
+        self.assertEqual(index.PostSearchResults('кошки').count(), 2)
+        self.assertEqual(index.PostSearchResults('').count(), 0)
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные посты постранично."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Кошка номер {number}')
+            for number in range(settings.LIMIT + 1)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        url = reverse('search:search')
+        response = self.client.get(url, {'q': 'кошка'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, settings.LIMIT + 2)
+        self.assertEqual(len(page_obj), settings.LIMIT)
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B0&amp;page=2')
+        response = self.client.get(url, {'q': 'кошка', 'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 2)
+        response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+
+    def test_admin_search(self):
+        """Поиск в админке идёт по индексу."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кошки'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post])
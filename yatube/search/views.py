@@ -0,0 +1,30 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+from django.shortcuts import render
+
+from posts.models import Post
+from posts.utils import PostPaginator
+
+from . import index
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = Post.objects.visible().select_related('author', 'group')
+    if index.is_available():
+        results = index.PostSearchResults(query, posts)
+    elif query:
+        results = posts.filter(
+            Q(text__icontains=query) | Q(comments__text__icontains=query)
+        ).distinct()
+    else:
+        results = posts.none()
+    paginator = PostPaginator(results, settings.LIMIT)
+    context = {
+        'query': query,
+        'page_obj': paginator.get_page(request.GET.get('page')),
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'search/search.html', context)
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'queue', 'task', 'status', 'attempts', 'run_at',
+                    'finished_at')
+    list_filter = ('queue', 'status')
+    search_fields = ('task',)
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(),
+            finished_at=None)
+
+    retry.short_description = 'Перезапустить выбранные задачи'
@@ -0,0 +1,91 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def task_path(task):
+    if isinstance(task, str):
+        return task
+    return f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *args, queue='default', delay=0, max_attempts=None,
+            **kwargs):
+    """Ставит вызов task(*args, **kwargs) в очередь и возвращает Job.
+
+    Задача пишется в ту же транзакцию, что и вызывающий код, поэтому
+    исполнитель увидит её только после коммита.
+    """
+    if queue not in settings.TASK_QUEUES:
+        raise ValueError(f'Неизвестная очередь: {queue}')
+    return Job.objects.create(
+        queue=queue,
+        task=task_path(task),
+        args=json.dumps(args, cls=DjangoJSONEncoder),
+        kwargs=json.dumps(kwargs, cls=DjangoJSONEncoder),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def claim(queue, limit):
+    """Забирает до limit готовых задач очереди и возвращает их id.
+
+    Забранная задача скрыта от других исполнителей на таймаут очереди.
+    Если исполнитель не отчитался за это время, задача снова доступна.
+    """
+    now = timezone.now()
+    timeout = timedelta(seconds=settings.TASK_QUEUES[queue]['timeout'])
+    ready = Job.objects.filter(queue=queue).filter(
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    ready.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=now,
+        last_error='Исполнитель не отчитался до конца таймаута')
+    job_ids = ready.order_by('run_at', 'id').values_list(
+        'id', flat=True)[:limit]
+    claimed = []
+    for job_id in list(job_ids):
+        # Условие ready повторяется в UPDATE: задачу заберёт только один.
+        if ready.filter(id=job_id).update(
+                status=Job.RUNNING, attempts=F('attempts') + 1,
+                locked_until=now + timeout):
+            claimed.append(job_id)
+    return claimed
+
+
+def execute(job_id):
+    """Выполняет забранную задачу. Возвращает True при успехе.
+
+    При ошибке задача возвращается в очередь с растущей задержкой,
+    пока не кончатся попытки.
+    """
+    job = Job.objects.get(id=job_id)
+    # Отчёт не перезапишет задачу, которую уже забрал другой исполнитель.
+    current = Job.objects.filter(id=job.id, status=Job.RUNNING,
+                                 attempts=job.attempts)
+    try:
+        func = import_string(job.task)
+        func(*json.loads(job.args), **json.loads(job.kwargs))
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.TASK_RETRY_DELAY * 2 ** (job.attempts - 1)
+            current.update(status=Job.QUEUED, last_error=error,
+                           run_at=now + timedelta(seconds=delay))
+        else:
+            current.update(status=Job.FAILED, last_error=error,
+                           finished_at=now)
+        return False
+    current.update(status=Job.DONE, finished_at=timezone.now())
+    return True
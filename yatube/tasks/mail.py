@@ -0,0 +1,63 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .jobs import enqueue
+
+
+def serialize_message(message):
+    """Письмо в виде, пригодном для аргументов задачи, или None."""
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            return None
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append(
+            (filename, base64.b64encode(content).decode(), mimetype))
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+        'content_subtype': message.content_subtype,
+    }
+
+
+def send_serialized(data):
+    """Отправляет письмо из задачи через настоящий почтовый бэкенд."""
+    data = dict(data)
+    attachments = data.pop('attachments')
+    content_subtype = data.pop('content_subtype')
+    message = EmailMultiAlternatives(**data)
+    message.content_subtype = content_subtype
+    for filename, content, mimetype in attachments:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    get_connection(settings.TASK_EMAIL_BACKEND).send_messages([message])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь mail вместо отправки внутри запроса."""
+
+    def send_messages(self, email_messages):
+        direct = []
+        for message in email_messages:
+            data = serialize_message(message)
+            if data is None:
+                direct.append(message)
+            else:
+                enqueue(send_serialized, data, queue='mail')
+        if direct:
+            get_connection(settings.TASK_EMAIL_BACKEND,
+                           fail_silently=self.fail_silently
+                           ).send_messages(direct)
+        return len(email_messages)
@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django import db
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import jobs
+
+
+def _execute(job_id):
+    try:
+        return jobs.execute(job_id)
+    finally:
+        db.connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет отложенные задачи, для каждой очереди свой пул процессов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queues', nargs='*',
+            help='Обрабатывать только эти очереди: '
+            + ', '.join(settings.TASK_QUEUES)
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, когда в очередях не останется готовых задач'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASK_POLL_INTERVAL,
+            help='Пауза между опросами пустых очередей в секундах'
+        )
+
+    def handle(self, *args, **options):
+        queues = options['queues'] or list(settings.TASK_QUEUES)
+        unknown = set(queues) - set(settings.TASK_QUEUES)
+        if unknown:
+            raise CommandError(
+                'Неизвестные очереди: ' + ', '.join(sorted(unknown)))
+        self.pools = {
+            queue: ProcessPoolExecutor(
+                max_workers=settings.TASK_QUEUES[queue]['concurrency'])
+            for queue in queues
+        }
+        self.running = {queue: set() for queue in queues}
+        self.done = self.failed = 0
+        try:
+            self.run(options['burst'], options['poll'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {self.done}, с ошибкой: {self.failed}'))
+
+    def run(self, burst, poll):
+        while True:
+            for queue in self.pools:
+                self.submit(queue)
+            futures = set().union(*self.running.values())
+            if not futures:
+                if burst:
+                    return
+                time.sleep(poll)
+                continue
+            finished, _ = wait(futures, timeout=poll,
+                               return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.result():
+                    self.done += 1
+                else:
+                    self.failed += 1
+            for running in self.running.values():
+                running -= finished
+
+    def submit(self, queue):
+        """Забирает задачи очереди по числу свободных процессов."""
+        free = (settings.TASK_QUEUES[queue]['concurrency']
+                - len(self.running[queue]))
+        job_ids = jobs.claim(queue, free) if free > 0 else []
+        # Дочерние процессы не должны делить соединение с родителем.
+        db.connections.close_all()
+        for job_id in job_ids:
+            self.running[queue].add(self.pools[queue].submit(_execute, job_id))
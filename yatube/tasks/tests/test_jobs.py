@@ -0,0 +1,132 @@
+from concurrent.futures import Future
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks import jobs
+from tasks.models import Job
+
+
+calls = []
+
+
+def record(*args, **kwargs):
+    calls.append((args, kwargs))
+
+
+def fail():
+    raise RuntimeError('Задача упала')
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_execute(self):
+        """Задача выполняется с переданными аргументами."""
+        job = jobs.enqueue(record, 1, 'два', key=timezone.now().date())
+        self.assertEqual(job.task, 'tasks.tests.test_jobs.record')
+        self.assertEqual(jobs.claim('default', 10), [job.id])
+        self.assertTrue(jobs.execute(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(
+            calls, [((1, 'два'), {'key': timezone.now().date().isoformat()})])
+
+    def test_delay_and_unknown_queue(self):
+        """Отложенная задача не берётся раньше времени."""
+        jobs.enqueue(record, delay=60)
+        self.assertEqual(jobs.claim('default', 10), [])
+        with self.assertRaises(ValueError):
+            jobs.enqueue(record, queue='unknown')
+
+    def test_retries(self):
+        """Упавшая задача повторяется с задержкой, пока есть попытки."""
+        job = jobs.enqueue(fail, max_attempts=2)
+        jobs.claim('default', 1)
+        self.assertFalse(jobs.execute(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('Задача упала', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(jobs.claim('default', 1), [])
+        Job.objects.update(run_at=timezone.now())
+        jobs.claim('default', 1)
+        self.assertFalse(jobs.execute(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_visibility_timeout(self):
+        """Забранная задача скрыта до конца таймаута очереди."""
+        job = jobs.enqueue(record, max_attempts=2)
+        self.assertEqual(jobs.claim('default', 1), [job.id])
+        self.assertEqual(jobs.claim('default', 1), [])
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.claim('default', 1), [job.id])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.claim('default', 1), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(calls, [])
+
+    @override_settings(
+        EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+        TASK_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+    )
+    def test_queued_email_backend(self):
+        """Письма уходят из очереди mail, а не из запроса."""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('file.txt', 'Вложение', 'text/plain')
+        message.send()
+        self.assertEqual(mail.outbox, [])
+        [job_id] = jobs.claim('mail', 10)
+        self.assertTrue(jobs.execute(job_id))
+        self.assertEqual(len(mail.outbox), 1)
+        sent = mail.outbox[0]
+        self.assertEqual(sent.subject, 'Тема')
+        self.assertEqual(sent.to, ['to@example.com'])
+        self.assertEqual(sent.alternatives[0][0], '<p>Текст</p>')
+        self.assertEqual(sent.attachments[0][1], 'Вложение')
+
+
+class SyncExecutor:
+    """Пул без параллельности: SQLite в памяти не пишет из двух потоков."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self):
+        pass
+
+
+class ProcessTasksTests(TransactionTestCase):
+    def test_process_tasks_command(self):
+        """Исполнитель выполняет все готовые задачи и выходит."""
+        for number in range(3):
+            jobs.enqueue(record, number)
+        jobs.enqueue(fail, max_attempts=1, queue='images')
+        out = StringIO()
+        with mock.patch(
+            'tasks.management.commands.process_tasks.ProcessPoolExecutor',
+            SyncExecutor
+        ):
+            call_command('process_tasks', '--burst', stdout=out)
+        self.assertIn('Выполнено задач: 3, с ошибкой: 1', out.getvalue())
+        self.assertEqual(
+            Job.objects.filter(status=Job.DONE).count(), 3)
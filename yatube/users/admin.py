@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+
+from core.admin import BackgroundDeleteMixin
+from posts.purge import soft_delete_users
+
+User = get_user_model()
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BackgroundDeleteMixin, BaseUserAdmin):
+    def soft_delete(self, request, pks):
+        soft_delete_users(pks)
@@ -27,12 +27,16 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'counters.apps.CountersConfig',
+    'tasks.apps.TasksConfig',
+    'search.apps.SearchConfig',
     'sorl.thumbnail',
     'debug_toolbar',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.page_cache.PageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -107,15 +111,32 @@ STATIC_URL = '/static/'
 
 LIMIT = 10
 
+PAGINATOR_WINDOW = 2
+
+COMMENTS_LIMIT = 20
+
+# Дальше этого числа строк админка не считает, а оценивает.
+ADMIN_COUNT_LIMIT = 10000
+
 TEST_PAGES = 3
 
+CURSOR_PAGINATION = False
+
+FEED_FANOUT_LIMIT = 1000
+
+FEED_BACKFILL_LIMIT = 1000
+
+FEED_BATCH_SIZE = 500
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
 LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+
+TASK_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -125,8 +146,74 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+FRAGMENT_CACHE_STATS = True
+
+CACHED_FRAGMENTS = ('index_page', 'follow_page')
+
+CACHE_LOCK_TIMEOUT = 10
+
+CACHE_LOCK_WAIT = 2
+
+CACHE_STALE_TTL = 60
+
+CACHE_XFETCH_BETA = 1.0
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Страницы, которые анонимы получают из кэша целиком.
+PAGE_CACHE_VIEWS = ('posts:index', 'posts:group_list', 'posts:profile',
+                    'posts:post_detail')
+
+# Из них вошедшим отдаются те, где от пользователя зависят только
+# шаблоны в тегах page_hole.
+PAGE_CACHE_SHARED_VIEWS = ('posts:index', 'posts:group_list')
+
+# Параметры запроса, которые читают эти страницы. С любыми другими
+# страница не кэшируется.
+PAGE_CACHE_QUERY_PARAMS = ('page', 'cursor', 'q')
+
+PAGE_CACHE_GENERATIONS = ('posts', 'groups', 'users', 'follows', 'comments')
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+TASK_QUEUES = {
+    'default': {'concurrency': 1, 'timeout': 5 * 60},
+    'images': {'concurrency': 2, 'timeout': 2 * 60},
+    'mail': {'concurrency': 1, 'timeout': 60},
+    'purge': {'concurrency': 1, 'timeout': 60 * 60},
+}
+
+TASK_MAX_ATTEMPTS = 3
+
+PURGE_BATCH_SIZE = 500
+
+# Просмотры постов копятся в памяти процессов, раз в окно переносятся
+# в общий кэш и оттуда сбрасываются в базу.
+VIEW_FLUSH_INTERVAL = 5
+
+VIEW_BUFFER_TTL = 10 * 60
+
+TASK_RETRY_DELAY = 30
+
+TASK_POLL_INTERVAL = 1
+
+IMAGE_PLACEHOLDER_SIZE = 16
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+        },
+    },
+    # Общий для всех процессов уровень. Подойдёт и memcached или Redis:
+    # нужны атомарные add() и incr().
+    'shared': {
+        'BACKEND': 'core.cache_backends.LockedFileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
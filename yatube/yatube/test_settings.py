@@ -0,0 +1,12 @@
+from .settings import *  # noqa: F401, F403
+from .settings import CACHES
+
+# Общий уровень кэша в памяти: тесты не читают и не очищают кэш
+# разработчика в BASE_DIR/cache.
+CACHES = {
+    **CACHES,
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared-tests',
+    },
+}